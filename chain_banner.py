@@ -4,19 +4,17 @@
 Modern AI-powered banner generator for blog posts using Typer CLI framework.
 """
 
+from collections.abc import Callable, Iterable, Sequence
 from enum import Enum
+from itertools import chain, islice
 from pathlib import Path
+from typing import TypeVar
 
 import typer
-from rich.console import Console
-from rich.panel import Panel
-from rich.progress import Progress, SpinnerColumn, TextColumn
-from rich.table import Table
-
-from lib.config import get_settings
-from lib.deepai import DeepAIClient, get_style_loader
-from lib.file_handler import MarkdownHandler, OutputHandler
-from lib.gpt import GPTClient
+from rich.console import Console, Group
+from rich.table import Column, Table
+
+from lib.deepai.styles import DeepAIStyle, get_style_loader
 from lib.selection_parser import parse_selection
 
 app = typer.Typer(
@@ -26,6 +24,22 @@ app = typer.Typer(
 )
 console = Console()
 
+# Max rows shown per page in interactive file selection
+FILE_PAGE_SIZE = 50
+
+T = TypeVar("T")
+
+MULTI_SELECT_HELP = "\n".join(
+    [
+        "\n[bold cyan]Multi-Select Options:[/bold cyan]",
+        "  • Single: [dim]1[/dim]",
+        "  • Multiple: [dim]1,3,5[/dim] or [dim]1 3 5[/dim]",
+        "  • Range: [dim]1-5[/dim]",
+        "  • All: [dim]all[/dim]",
+        "  • Quit: [dim]q[/dim]",
+    ]
+)
+
 
 class Version(str, Enum):
     """DeepAI generator version options"""
@@ -35,14 +49,87 @@ class Version(str, Enum):
     genius = "genius"
 
 
-def interactive_select_style(default_slug: str = "origami-3d-generator") -> str:
+def _render_select_table(
+    title: str, columns: Sequence[str | Column], rows: Iterable[Sequence[str]]
+) -> Table:
+    """Build a numbered selection table
+
+    Args:
+        title: Table title
+        columns: Headers (or rich Columns) after the leading "#" column
+        rows: Row cells, starting with the item number
+
+    Returns:
+        Table ready to print
+    """
+    table = Table(Column("#", style="cyan", width=4), *columns, title=title, show_header=True)
+    for row in rows:
+        table.add_row(*row)
+    return table
+
+
+def _prompt_loop(
+    prompt_text: str, parse: Callable[[str], T], quit_message: str | None = "Cancelled."
+) -> T:
+    """Read input until parse accepts it
+
+    Args:
+        prompt_text: Input prompt shown to the user
+        parse: Converts the stripped input into a result, raising ValueError
+            with a user-facing message when the input is invalid
+        quit_message: Message shown when the user enters 'q' (None disables 'q')
+
+    Returns:
+        The first successfully parsed result
+    """
+    while True:
+        try:
+            choice = console.input(prompt_text).strip()
+
+            if quit_message is not None and choice.lower() == "q":
+                console.print(f"[yellow]{quit_message}[/yellow]")
+                raise typer.Exit(0)
+
+            return parse(choice)
+        except ValueError as e:
+            console.print(f"[red]{e}[/red]")
+        except KeyboardInterrupt:
+            console.print(f"\n[yellow]{quit_message or 'Exiting...'}[/yellow]")
+            raise typer.Exit(0) from None
+
+
+def _parse_number(choice: str, count: int, invalid_message: str) -> int:
+    """Parse a 1-based item number
+
+    Args:
+        choice: User input
+        count: Number of items
+        invalid_message: Message for non-numeric input
+
+    Returns:
+        0-based index
+
+    Raises:
+        ValueError: If input is not a number within 1-count
+    """
+    try:
+        number = int(choice)
+    except ValueError:
+        raise ValueError(invalid_message) from None
+
+    if not 1 <= number <= count:
+        raise ValueError(f"Please enter a number between 1 and {count}")
+    return number - 1
+
+
+def interactive_select_style(default_slug: str = "origami-3d-generator") -> DeepAIStyle:
     """Display styles and let user select one interactively
 
     Args:
         default_slug: Default style slug to pre-select
 
     Returns:
-        Selected style slug
+        Selected style
     """
     loader = get_style_loader()
     styles = loader.list_styles()
@@ -51,54 +138,66 @@ def interactive_select_style(default_slug: str = "origami-3d-generator") -> str:
         console.print("[red]No styles found in configuration.[/red]")
         raise typer.Exit(1)
 
-    # Create a table for style selection
-    table = Table(title="🎨 Select DeepAI Image Generation Style", show_header=True)
-    table.add_column("#", style="cyan", width=4)
-    table.add_column("Style Name", style="green")
-    table.add_column("Description", style="dim", max_width=60)
-
     # Find default index
-    default_index = 0
-    for idx, style in enumerate(styles, 1):
-        if style.slug == default_slug:
-            default_index = idx
-        table.add_row(
+    default_index = next(
+        (idx for idx, style in enumerate(styles, 1) if style.slug == default_slug), 0
+    )
+
+    rows = [
+        (
             str(idx),
-            f"{'[bold]' if style.slug == default_slug else ''}{style.name}{'[/bold]' if style.slug == default_slug else ''}",
+            f"[bold]{style.name}[/bold]" if idx == default_index else style.name,
             (style.description[:57] + "..." if len(style.description) > 60 else style.description),
         )
-
-    console.print(table)
+        for idx, style in enumerate(styles, 1)
+    ]
+    columns = [
+        Column("Style Name", style="green"),
+        Column("Description", style="dim", max_width=60),
+    ]
+    console.print(_render_select_table("🎨 Select DeepAI Image Generation Style", columns, rows))
     console.print(f"\n[dim]Default: #{default_index} - {styles[default_index - 1].name}[/dim]")
 
-    # Get user selection
-    while True:
-        selection = console.input(
-            "\n[bold cyan]Select style number (or press Enter for default):[/bold cyan] "
-        ).strip()
-
+    def parse(choice: str) -> int:
         # Use default if empty
-        if not selection:
-            selected_style = styles[default_index - 1]
-            break
+        if not choice:
+            return default_index - 1
+        return _parse_number(choice, len(styles), "Invalid input. Please enter a number.")
+
+    index = _prompt_loop(
+        "\n[bold cyan]Select style number (or press Enter for default):[/bold cyan] ",
+        parse,
+        quit_message=None,
+    )
+    return styles[index]
 
-        # Validate selection
-        try:
-            idx = int(selection)
-            if 1 <= idx <= len(styles):
-                selected_style = styles[idx - 1]
-                break
-            else:
-                console.print(f"[red]Invalid selection. Please enter 1-{len(styles)}[/red]")
-        except ValueError:
-            console.print("[red]Invalid input. Please enter a number.[/red]")
 
-    return selected_style.slug
+def _resolve_style(deepai_style: str | None) -> DeepAIStyle:
+    """Look up the style given on the command line, or ask for one interactively
+
+    Args:
+        deepai_style: Style slug from --deepai-style, or None
+
+    Returns:
+        Selected style
+    """
+    if not deepai_style:
+        console.print("\n")
+        return interactive_select_style()
+
+    selected_style = get_style_loader().get_style(deepai_style)
+    if not selected_style:
+        console.print(f"[red]Invalid style: {deepai_style}[/red]")
+        raise typer.Exit(1)
+    return selected_style
 
 
 def interactive_select_file(files: list[Path]) -> Path:
     """Display files and let user select one interactively
 
+    Long file lists are shown FILE_PAGE_SIZE rows at a time; 'n'/'p' page
+    through them and any file number can be entered from any page.
+
     Args:
         files: List of file paths to choose from
 
@@ -109,37 +208,57 @@ def interactive_select_file(files: list[Path]) -> Path:
         console.print("[red]No markdown files found.[/red]")
         raise typer.Exit(1)
 
-    # Create a table for file selection
-    table = Table(title="📁 Available Markdown Files", show_header=True)
-    table.add_column("#", style="cyan", width=4)
-    table.add_column("File", style="green")
+    # Long paths collapse to the bare file name; str() is computed once per file
+    paths = list(map(str, files))
+    rows = [
+        (str(idx), file_path.name if len(path) > 50 else path)
+        for idx, (file_path, path) in enumerate(zip(files, paths, strict=True), 1)
+    ]
+    last_page = (len(rows) - 1) // FILE_PAGE_SIZE
+    page = 0
+
+    def parse(choice: str) -> int | str:
+        if choice.lower() in ("n", "p") and last_page:
+            return choice.lower()
+        return _parse_number(
+            choice, len(files), "Invalid input. Please enter a number or 'q' to quit."
+        )
 
-    for idx, file_path in enumerate(files, 1):
-        display_name = file_path.name if len(str(file_path)) > 50 else str(file_path)
-        table.add_row(str(idx), display_name)
+    while True:
+        # Show the current page of files
+        start = page * FILE_PAGE_SIZE
+        table = _render_select_table(
+            "📁 Available Markdown Files",
+            [Column("File", style="green")],
+            rows[start : start + FILE_PAGE_SIZE],
+        )
 
-    console.print(table)
+        remaining = len(rows) - start - FILE_PAGE_SIZE
+        if remaining > 0:
+            table.add_row("…", f"[dim]{remaining} more - enter 'n' for next page[/dim]")
 
-    while True:
-        try:
-            choice = console.input(
-                f"\n[bold cyan]Select a file (1-{len(files)}) or 'q' to quit:[/bold cyan] "
-            ).strip()
+        console.print(table)
+        if last_page:
+            console.print(f"[dim]Page {page + 1}/{last_page + 1} ('n' next, 'p' previous)[/dim]")
 
-            if choice.lower() == "q":
-                console.print("[yellow]Exiting...[/yellow]")
-                raise typer.Exit(0)
+        result = _prompt_loop(
+            f"\n[bold cyan]Select a file (1-{len(files)}) or 'q' to quit:[/bold cyan] ",
+            parse,
+            quit_message="Exiting...",
+        )
+        if isinstance(result, int):
+            return files[result]
 
-            choice_num = int(choice)
-            if 1 <= choice_num <= len(files):
-                return files[choice_num - 1]
-            else:
-                console.print(f"[red]Please enter a number between 1 and {len(files)}[/red]")
-        except ValueError:
-            console.print("[red]Invalid input. Please enter a number or 'q' to quit.[/red]")
-        except KeyboardInterrupt:
-            console.print("\n[yellow]Exiting...[/yellow]")
-            raise typer.Exit(0) from None
+        page = min(max(page + (1 if result == "n" else -1), 0), last_page)
+
+
+def _render_prompts_table(prompts: list[str]) -> Table:
+    """Build the numbered table of generated prompts"""
+    return _render_select_table(
+        f"💡 Generated {len(prompts)} Origami Prompts",
+        [Column("Prompt", style="magenta")],
+        ((str(idx), prompt) for idx, prompt in enumerate(prompts, 1)),
+    )
 
 
 def interactive_select_prompt(prompts: list[str]) -> str:
@@ -151,35 +270,15 @@ def interactive_select_prompt(prompts: list[str]) -> str:
     Returns:
         Selected prompt
     """
-    table = Table(title=f"💡 Generated {len(prompts)} Origami Prompts", show_header=True)
-    table.add_column("#", style="cyan", width=4)
-    table.add_column("Prompt", style="magenta")
+    console.print(_render_prompts_table(prompts))
 
-    for idx, prompt in enumerate(prompts, 1):
-        table.add_row(str(idx), prompt)
-
-    console.print(table)
-
-    while True:
-        try:
-            choice = console.input(
-                f"\n[bold cyan]Select a prompt (1-{len(prompts)}) or 'q' to quit:[/bold cyan] "
-            ).strip()
-
-            if choice.lower() == "q":
-                console.print("[yellow]Cancelled.[/yellow]")
-                raise typer.Exit(0)
-
-            choice_num = int(choice)
-            if 1 <= choice_num <= len(prompts):
-                return prompts[choice_num - 1]
-            else:
-                console.print(f"[red]Please enter a number between 1 and {len(prompts)}[/red]")
-        except ValueError:
-            console.print("[red]Invalid input. Please enter a number or 'q' to quit.[/red]")
-        except KeyboardInterrupt:
-            console.print("\n[yellow]Exiting...[/yellow]")
-            raise typer.Exit(0) from None
+    index = _prompt_loop(
+        f"\n[bold cyan]Select a prompt (1-{len(prompts)}) or 'q' to quit:[/bold cyan] ",
+        lambda choice: _parse_number(
+            choice, len(prompts), "Invalid input. Please enter a number or 'q' to quit."
+        ),
+    )
+    return prompts[index]
 
 
 def interactive_select_prompts(prompts: list[str]) -> list[int]:
@@ -191,52 +290,37 @@ def interactive_select_prompts(prompts: list[str]) -> list[int]:
     Returns:
         List of selected prompt indices (0-based)
     """
-    table = Table(title=f"💡 Generated {len(prompts)} Origami Prompts", show_header=True)
-    table.add_column("#", style="cyan", width=4)
-    table.add_column("Prompt", style="magenta")
-
-    for idx, prompt in enumerate(prompts, 1):
-        table.add_row(str(idx), prompt)
+    # Table and options rendered together in a single write
+    console.print(Group(_render_prompts_table(prompts), MULTI_SELECT_HELP))
 
-    console.print(table)
-    console.print("\n[bold cyan]Multi-Select Options:[/bold cyan]")
-    console.print("  • Single: [dim]1[/dim]")
-    console.print("  • Multiple: [dim]1,3,5[/dim] or [dim]1 3 5[/dim]")
-    console.print("  • Range: [dim]1-5[/dim]")
-    console.print("  • All: [dim]all[/dim]")
-    console.print("  • Quit: [dim]q[/dim]")
+    def parse(choice: str) -> list[int]:
+        if choice.lower() == "all":
+            console.print(f"\n[green]Selected all {len(prompts)} prompts[/green]")
+            return list(range(len(prompts)))
 
-    while True:
         try:
-            choice = console.input("\n[bold cyan]Select prompts:[/bold cyan] ").strip()
+            selected = parse_selection(choice, len(prompts))
+        except ValueError as e:
+            raise ValueError(f"Error: {e}") from e
 
-            if choice.lower() == "q":
-                console.print("[yellow]Cancelled.[/yellow]")
-                raise typer.Exit(0)
+        if not selected:
+            raise ValueError("Invalid selection. Try again.")
 
-            if choice.lower() == "all":
-                selected = list(range(len(prompts)))
-                console.print(f"\n[green]Selected all {len(selected)} prompts[/green]")
-                return selected
+        # Show confirmation
+        console.print(
+            f"\n[green]Selected {len(selected)} prompt(s): {[i + 1 for i in selected]}[/green]"
+        )
+        return selected
 
-            # Parse selection
-            selected = parse_selection(choice, len(prompts))
+    return _prompt_loop("\n[bold cyan]Select prompts:[/bold cyan] ", parse)
 
-            if selected:
-                # Show confirmation
-                console.print(
-                    f"\n[green]Selected {len(selected)} prompt(s): "
-                    f"{[i + 1 for i in selected]}[/green]"
-                )
-                return selected
-            else:
-                console.print("[red]Invalid selection. Try again.[/red]")
 
-        except ValueError as e:
-            console.print(f"[red]Error: {e}[/red]")
-        except KeyboardInterrupt:
-            console.print("\n[yellow]Cancelled.[/yellow]")
-            raise typer.Exit(0) from None
+@app.callback()
+def main() -> None:
+    """Set up file logging for every command (not for --help)"""
+    from lib.logger import configure_file_logging
+
+    configure_file_logging()
 
 
 @app.command()
@@ -249,25 +333,21 @@ def list_styles() -> None:
         console.print("[red]No styles found in configuration.[/red]")
         raise typer.Exit(1)
 
-    # Create a detailed table
-    table = Table(title="🎨 Available DeepAI Image Generation Styles", show_header=True)
-    table.add_column("#", style="cyan", width=4)
-    table.add_column("Slug", style="yellow", width=30)
-    table.add_column("Name", style="green", width=35)
-    table.add_column("Description", style="dim")
-
-    for idx, style in enumerate(styles, 1):
-        table.add_row(
-            str(idx),
-            style.slug,
-            style.name,
-            style.description,
-        )
-
-    console.print(table)
-    console.print(f"\n[bold]Total: {len(styles)} styles available[/bold]")
+    # Build the detailed table and footer, then render them in one print
+    rows = [
+        (str(idx), style.slug, style.name, style.description) for idx, style in enumerate(styles, 1)
+    ]
+    columns = [
+        Column("Slug", style="yellow", width=30),
+        Column("Name", style="green", width=35),
+        Column("Description", style="dim"),
+    ]
     console.print(
-        "\n[dim]Use --deepai-style <slug> or interactive selection in generate command[/dim]"
+        Group(
+            _render_select_table("🎨 Available DeepAI Image Generation Styles", columns, rows),
+            f"\n[bold]Total: {len(styles)} styles available[/bold]",
+            "\n[dim]Use --deepai-style <slug> or interactive selection in generate command[/dim]",
+        )
     )
 
 
@@ -333,8 +413,40 @@ def generate(
         envvar="DEEPAI_API_KEY",
         help="DeepAI API key (or set DEEPAI_API_KEY env var)",
     ),
+    no_cache: bool = typer.Option(
+        False,
+        "--no-cache",
+        help="Ignore cached prompts and images and generate them again",
+    ),
+    concurrency: int | None = typer.Option(
+        None,
+        "--concurrency",
+        min=1,
+        max=8,
+        help="Banners generated in parallel (or set DEEPAI_MAX_CONCURRENCY)",
+    ),
 ) -> None:
     """Generate banner image from blog post using AI"""
+    # Heavy modules (pydantic settings, OpenAI SDK, requests, asyncio, rich live
+    # display) are imported only by the commands that use them, keeping --help
+    # and list-styles fast
+    import asyncio
+    import threading
+
+    from rich.panel import Panel
+    from rich.progress import Progress, SpinnerColumn, TextColumn
+
+    from lib.config import get_settings, is_multiple_of_32
+    from lib.deepai import DeepAIClient
+    from lib.file_handler import MarkdownHandler, OutputHandler
+    from lib.prompt_cache import (
+        get_cached_prompts,
+        hash_prompt,
+        load_cache,
+        save_cache,
+        set_cached_prompts,
+    )
+    from lib.semantic_cache import find_similar_prompts, term_vector
 
     # Load settings
     try:
@@ -350,33 +462,33 @@ def generate(
         raise typer.Exit(1) from e
 
     # Validate dimensions
-    if width % 32 != 0 or height % 32 != 0:
+    if not (is_multiple_of_32(width) and is_multiple_of_32(height)):
         console.print("[red]Error: Width and height must be multiples of 32[/red]")
         raise typer.Exit(1)
 
-    # Interactive style selection if not provided
-    if not deepai_style:
-        console.print("\n")
-        deepai_style = interactive_select_style()
-
-    # Validate the selected style
-    style_loader = get_style_loader()
-    selected_style = style_loader.get_style(deepai_style)
-    if not selected_style:
-        console.print(f"[red]Invalid style: {deepai_style}[/red]")
-        raise typer.Exit(1)
-
-    console.print(f"\n✨ [green]Using style:[/green] {selected_style.name}")
-    console.print(f"[dim]{selected_style.description}[/dim]\n")
-
-    # Initialize clients
+    # Initialize the DeepAI client before any interactive step so it fails fast;
+    # the GPT client is only needed (and imported) on a prompt cache miss
     try:
-        gpt_client = GPTClient(openai_key)
         deepai_client = DeepAIClient(deepai_key)
     except Exception as e:
         console.print(f"[red]Failed to initialize clients: {e}[/red]")
         raise typer.Exit(1) from e
 
+    if concurrency is not None:
+        deepai_client.max_concurrency = concurrency
+    if no_cache:
+        deepai_client.image_cache_ttl = 0
+
+    if not input_dir.is_dir():
+        console.print(f"[red]Input directory not found: {input_dir}[/red]")
+        raise typer.Exit(1)
+
+    selected_style = _resolve_style(deepai_style)
+    deepai_style = selected_style.slug
+
+    console.print(f"\n✨ [green]Using style:[/green] {selected_style.name}")
+    console.print(f"[dim]{selected_style.description}[/dim]\n")
+
     # Find markdown files
     console.print(f"🔍 Searching for markdown files in: [cyan]{input_dir}[/cyan]")
     files = MarkdownHandler.find_markdown_files(input_dir)
@@ -391,70 +503,127 @@ def generate(
     selected_file = interactive_select_file(files)
     console.print(f"\n✅ [green]Selected:[/green] {selected_file}")
 
-    # Parse the file
-    with Progress(
+    # Connect to DeepAI while prompts are generated and chosen
+    threading.Thread(target=deepai_client.warm_up, daemon=True).start()
+
+    # One live progress display shared by every phase; paused for interactive input.
+    # Disabled when output is piped so no refresh thread runs for a non-terminal.
+    progress = Progress(
         SpinnerColumn(),
         TextColumn("[progress.description]{task.description}"),
         console=console,
-    ) as progress:
+        disable=not console.is_terminal,
+    )
+
+    with progress:
+        # Parse the file
         task = progress.add_task("📖 Parsing blog post...", total=None)
         front_matter, body = MarkdownHandler.parse_markdown_post(selected_file)
-        progress.update(task, completed=True)
-
-    # Get title and display info
-    title = front_matter.get("title", "Blog Post")
-    tags = front_matter.get("tags", []) + front_matter.get("categories", [])
-
-    info_panel = Panel(
-        f"[bold]Title:[/bold] {title}\n"
-        f"[bold]Tags:[/bold] {', '.join(tags[:5]) if tags else 'None'}\n"
-        f"[bold]Style:[/bold] {selected_style.name}",
-        title="📄 Post Info",
-        border_style="blue",
-    )
-    console.print(info_panel)
+        progress.remove_task(task)
 
-    # Generate prompts using the new unified method
-    with Progress(
-        SpinnerColumn(),
-        TextColumn("[progress.description]{task.description}"),
-        console=console,
-    ) as progress:
-        task = progress.add_task(
-            f"🤖 Asking ChatGPT to create {prompt_count} prompts for {selected_style.name}...",
-            total=None,
-        )
-        prompts = gpt_client.generate_prompts(
-            title=title,
-            content=body,
-            deepai_style_slug=deepai_style,
-            num_prompts=prompt_count,
+        # Get title and display info
+        title = front_matter.get("title", "Blog Post")
+        # Only the first few tags are shown, so don't concatenate the full lists
+        tags = list(
+            islice(chain(front_matter.get("tags") or (), front_matter.get("categories") or ()), 5)
         )
-        progress.update(task, completed=True)
 
-    if not prompts:
-        console.print("[red]❌ No prompts generated. Exiting.[/red]")
-        raise typer.Exit(1)
+        info_panel = Panel(
+            f"[bold]Title:[/bold] {title}\n"
+            f"[bold]Tags:[/bold] {', '.join(tags) if tags else 'None'}\n"
+            f"[bold]Style:[/bold] {selected_style.name}",
+            title="📄 Post Info",
+            border_style="blue",
+        )
+        console.print(info_panel)
+
+        # Reuse cached prompts for unchanged posts
+        cache_path = settings.cache_dir / "prompts.json"
+        cache_key = hash_prompt(deepai_style, title, body)
+        prompt_cache = load_cache(cache_path)
+        post_terms = term_vector(title, body)
+        prompts = None
+        if not no_cache:
+            prompts = get_cached_prompts(
+                prompt_cache, cache_key, prompt_count, settings.prompt_cache_ttl
+            ) or find_similar_prompts(
+                prompt_cache,
+                deepai_style,
+                post_terms,
+                prompt_count,
+                settings.prompt_cache_ttl,
+                settings.semantic_cache_threshold,
+            )
+
+        if prompts:
+            console.print(f"♻️  [green]Using {len(prompts)} cached prompts[/green]")
+        else:
+            from lib.gpt import GPTClient
+
+            try:
+                gpt_client = GPTClient(openai_key)
+            except Exception as e:
+                console.print(f"[red]Failed to initialize clients: {e}[/red]")
+                raise typer.Exit(1) from e
+
+            # Generate prompts using the new unified method
+            task = progress.add_task(
+                f"🤖 Asking ChatGPT to create {prompt_count} prompts for {selected_style.name}...",
+                total=None,
+            )
+
+            async def ask_gpt() -> list[str]:
+                # Close pooled connections inside the event loop that opened them
+                async with gpt_client:
+                    streamed: list[str] = []
+                    async for prompt in gpt_client.astream_prompts(
+                        title=title,
+                        content=body,
+                        deepai_style_slug=deepai_style,
+                        num_prompts=prompt_count,
+                    ):
+                        streamed.append(prompt)
+                        progress.update(
+                            task,
+                            description=(
+                                f"🤖 ChatGPT is writing prompts ({len(streamed)}/{prompt_count})..."
+                            ),
+                        )
+                    return streamed
+
+            try:
+                prompts = asyncio.run(ask_gpt())
+            except Exception as e:
+                progress.stop()
+                console.print(f"[red]Error calling OpenAI API: {e}[/red]")
+                raise typer.Exit(1) from e
+            progress.remove_task(task)
+
+            if prompts and settings.prompt_cache_ttl > 0:
+                set_cached_prompts(
+                    prompt_cache, cache_key, prompts, style=deepai_style, terms=post_terms
+                )
+                save_cache(prompt_cache, cache_path, settings.prompt_cache_ttl)
 
-    # Interactive prompt selection
-    selected_indices = interactive_select_prompts(prompts)
-    banner_prompts = [prompts[i] for i in selected_indices]
+        if not prompts:
+            console.print("[red]❌ No prompts generated. Exiting.[/red]")
+            raise typer.Exit(1)
 
-    # Prepare output path(s) - always use batch mode logic
-    output_dir.mkdir(parents=True, exist_ok=True)
+        # Interactive prompt selection (live display paused while reading input)
+        progress.stop()
+        selected_indices = interactive_select_prompts(prompts)
+        banner_prompts = [prompts[i] for i in selected_indices]
 
-    if banner_prompts:
-        # Generate using batch logic (handles single or multiple)
-        from datetime import datetime
+        if not banner_prompts:
+            return
 
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        # Prepare output path(s) - always use batch mode logic (handles single or multiple)
         output_paths = OutputHandler.generate_batch_output_paths(
-            selected_file, output_dir, len(banner_prompts), timestamp
+            selected_file, output_dir, len(banner_prompts)
         )
 
         # Ensure directories exist
-        for output_path in output_paths:
-            OutputHandler.ensure_output_directory(output_path)
+        OutputHandler.ensure_output_directories(output_paths)
 
         # Show appropriate message
         if len(banner_prompts) == 1:
@@ -462,62 +631,191 @@ def generate(
         else:
             console.print(f"\n🎨 [bold]Generating {len(banner_prompts)} banners...[/bold]")
 
-        # Generate all banners with progress tracking
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            console=console,
-        ) as progress:
+        # Generate all banners concurrently with progress tracking
+        names = [output_path.name for output_path in output_paths]
+        progress.start()
+        with deepai_client:
             task = progress.add_task("Generating banners...", total=len(banner_prompts))
 
-            successful = 0
-            failed = 0
-            failed_prompts = []
-
-            for prompt, output_path in zip(banner_prompts, output_paths, strict=False):
-                progress.update(task, description=f"Generating {output_path.name}...")
+            def on_complete(index: int, success: bool) -> None:
+                if success:
+                    console.print(f"  ✓ [green]{names[index]}[/green]")
+                else:
+                    console.print(f"  ✗ [red]{names[index]}[/red]")
+                progress.advance(task)
 
-                success = deepai_client.generate_and_save(
-                    prompt=prompt,
-                    output_path=output_path,
+            results = asyncio.run(
+                deepai_client.agenerate_batch(
+                    banner_prompts,
+                    output_paths,
+                    on_complete=on_complete,
                     deepai_style=deepai_style,
                     width=width,
                     height=height,
                     version=version.value,
                 )
+            )
 
-                if success:
-                    console.print(f"  ✓ [green]{output_path.name}[/green]")
-                    successful += 1
-                else:
-                    console.print(f"  ✗ [red]{output_path.name}[/red]")
-                    failed += 1
-                    failed_prompts.append((output_path.name, prompt[:60]))
+    successful = 0
+    failed = 0
+    failed_prompts = []
 
-                progress.advance(task)
+    for i, result in enumerate(results):
+        if result is True:
+            successful += 1
+        else:
+            if isinstance(result, BaseException):
+                console.print(f"  ✗ [red]{names[i]}: {result}[/red]")
+            failed += 1
+            failed_prompts.append((names[i], banner_prompts[i][:60]))
+
+    # Enhanced summary
+    if len(banner_prompts) == 1:
+        if successful:
+            console.print(
+                f"\n✨ [bold green]Done![/bold green] Banner saved to: [cyan]{output_paths[0]}[/cyan]"
+            )
+        else:
+            console.print("\n[red]❌ Banner generation failed.[/red]")
+            raise typer.Exit(1)
+    else:
+        total = successful + failed
+        success_rate = (successful / total * 100) if total > 0 else 0
+
+        # Build the whole summary first and render it in one print
+        lines = [
+            "\n✨ [bold green]Batch complete![/bold green]",
+            f"  ✓ {successful} successful, ✗ {failed} failed",
+            f"  Success rate: {success_rate:.1f}%",
+            f"  [cyan]Output directory: {output_dir}[/cyan]",
+        ]
+        if failed_prompts:
+            lines.append("\n[yellow]Failed images:[/yellow]")
+            lines.extend(f"  • {name}: {preview}..." for name, preview in failed_prompts)
+        console.print("\n".join(lines))
 
-        # Enhanced summary
-        if len(banner_prompts) == 1:
-            if successful:
-                console.print(
-                    f"\n✨ [bold green]Done![/bold green] Banner saved to: [cyan]{output_paths[0]}[/cyan]"
+
+@app.command()
+def prefetch(
+    input_dir: Path | None = typer.Option(
+        None,
+        "--input-dir",
+        "-i",
+        help="Directory containing markdown blog posts",
+    ),
+    deepai_style: str | None = typer.Option(
+        None,
+        "--deepai-style",
+        "-ds",
+        help="DeepAI style slug (skips interactive selection)",
+    ),
+    prompt_count: int = typer.Option(
+        10,
+        "--prompt-count",
+        "-pc",
+        min=1,
+        max=20,
+        help="Number of prompts to generate per post",
+    ),
+    batch: bool = typer.Option(
+        False,
+        "--batch",
+        help="Use the OpenAI Batch API (half price, may take up to 24 hours)",
+    ),
+    openai_key: str | None = typer.Option(
+        None,
+        "--openai-key",
+        envvar="OPENAI_API_KEY",
+        help="OpenAI API key (or set OPENAI_API_KEY env var)",
+    ),
+) -> None:
+    """Generate and cache prompts for every post so generate starts instantly"""
+    import asyncio
+
+    from lib.config import get_settings
+    from lib.file_handler import MarkdownHandler
+    from lib.gpt import GPTClient
+    from lib.prompt_cache import (
+        get_cached_prompts,
+        hash_prompt,
+        load_cache,
+        save_cache,
+        set_cached_prompts,
+    )
+    from lib.semantic_cache import term_vector
+
+    try:
+        settings = get_settings()
+        input_dir = input_dir or settings.default_input_dir
+        gpt_client = GPTClient(openai_key)
+    except Exception as e:
+        console.print(f"[red]Failed to initialize OpenAI client: {e}[/red]")
+        raise typer.Exit(1) from e
+
+    if settings.prompt_cache_ttl <= 0:
+        console.print("[red]Prompt cache is disabled (PROMPT_CACHE_TTL=0)[/red]")
+        raise typer.Exit(1)
+
+    if not input_dir.is_dir():
+        console.print(f"[red]Input directory not found: {input_dir}[/red]")
+        raise typer.Exit(1)
+
+    selected_style = _resolve_style(deepai_style)
+    deepai_style = selected_style.slug
+
+    # Only posts without fresh cached prompts need a request
+    cache_path = settings.cache_dir / "prompts.json"
+    prompt_cache = load_cache(cache_path)
+    pending = []
+    for path in MarkdownHandler.find_markdown_files(input_dir):
+        front_matter, body = MarkdownHandler.parse_markdown_post(path)
+        title = front_matter.get("title", "Blog Post")
+        cache_key = hash_prompt(deepai_style, title, body)
+        if not get_cached_prompts(prompt_cache, cache_key, prompt_count, settings.prompt_cache_ttl):
+            pending.append((path, cache_key, title, body))
+
+    if not pending:
+        console.print("[green]All posts already have cached prompts[/green]")
+        return
+
+    posts = [(title, body) for _, _, title, body in pending]
+    console.print(f"🤖 Generating prompts for {len(posts)} post(s) in {selected_style.name}...")
+    try:
+        if batch:
+            with gpt_client, console.status("Waiting for the OpenAI batch to complete..."):
+                results: list[list[str] | BaseException] = list(
+                    gpt_client.generate_prompts_via_batch(posts, deepai_style, prompt_count)
                 )
-            else:
-                console.print("\n[red]❌ Banner generation failed.[/red]")
-                raise typer.Exit(1)
         else:
-            total = successful + failed
-            success_rate = (successful / total * 100) if total > 0 else 0
 
-            console.print("\n✨ [bold green]Batch complete![/bold green]")
-            console.print(f"  ✓ {successful} successful, ✗ {failed} failed")
-            console.print(f"  Success rate: {success_rate:.1f}%")
-            console.print(f"  [cyan]Output directory: {output_dir}[/cyan]")
+            async def ask_gpt() -> list[list[str] | BaseException]:
+                async with gpt_client:
+                    return await gpt_client.agenerate_prompts_batch(
+                        posts, deepai_style, prompt_count
+                    )
 
-            if failed_prompts:
-                console.print("\n[yellow]Failed images:[/yellow]")
-                for name, prompt_preview in failed_prompts:
-                    console.print(f"  • {name}: {prompt_preview}...")
+            results = asyncio.run(ask_gpt())
+    except Exception as e:
+        console.print(f"[red]Error calling OpenAI API: {e}[/red]")
+        raise typer.Exit(1) from e
+
+    cached = 0
+    for (path, cache_key, title, body), prompts in zip(pending, results, strict=True):
+        if isinstance(prompts, BaseException) or not prompts:
+            console.print(f"  ✗ [red]{path.name}: {prompts or 'no prompts returned'}[/red]")
+            continue
+        set_cached_prompts(
+            prompt_cache, cache_key, prompts, style=deepai_style, terms=term_vector(title, body)
+        )
+        cached += 1
+        console.print(f"  ✓ [green]{path.name}[/green]")
+
+    save_cache(prompt_cache, cache_path, settings.prompt_cache_ttl)
+    console.print(
+        f"\n✨ [bold green]Cached prompts for {cached}/{len(pending)} post(s)[/bold green]"
+    )
+    if cached < len(pending):
+        raise typer.Exit(1)
 
 
 @app.command()
@@ -563,27 +861,25 @@ def direct(
         envvar="DEEPAI_API_KEY",
         help="DeepAI API key",
     ),
+    no_cache: bool = typer.Option(
+        False,
+        "--no-cache",
+        help="Ignore the cached image for an identical request and generate it again",
+    ),
 ) -> None:
     """Generate banner directly from a text prompt (no AI chain)"""
+    from rich.panel import Panel
+
+    from lib.config import is_multiple_of_32
+    from lib.deepai import DeepAIClient
+    from lib.file_handler import OutputHandler
 
     # Validate dimensions
-    if width % 32 != 0 or height % 32 != 0:
+    if not (is_multiple_of_32(width) and is_multiple_of_32(height)):
         console.print("[red]Error: Width and height must be multiples of 32[/red]")
         raise typer.Exit(1)
 
-    # Interactive style selection if not provided
-    if not deepai_style:
-        console.print("\n")
-        deepai_style = interactive_select_style()
-
-    # Validate the selected style
-    style_loader = get_style_loader()
-    selected_style = style_loader.get_style(deepai_style)
-    if not selected_style:
-        console.print(f"[red]Invalid style: {deepai_style}[/red]")
-        raise typer.Exit(1)
-
-    # Initialize DeepAI client
+    # Initialize DeepAI client before style selection so a missing key fails fast
     try:
         deepai_client = DeepAIClient(deepai_key)
     except Exception as e:
@@ -592,6 +888,11 @@ def direct(
             "\n[yellow]Set DEEPAI_API_KEY environment variable or use --deepai-key[/yellow]"
         )
         raise typer.Exit(1) from e
+    if no_cache:
+        deepai_client.image_cache_ttl = 0
+
+    selected_style = _resolve_style(deepai_style)
+    deepai_style = selected_style.slug
 
     # Prepare output
     OutputHandler.ensure_output_directory(output)
@@ -612,14 +913,15 @@ def direct(
     # Generate
     console.print("\n🎨 [bold]Generating banner...[/bold]")
 
-    success = deepai_client.generate_and_save(
-        prompt=prompt,
-        output_path=output,
-        deepai_style=deepai_style,
-        width=width,
-        height=height,
-        version=version.value,
-    )
+    with deepai_client:
+        success = deepai_client.generate_and_save(
+            prompt=prompt,
+            output_path=output,
+            deepai_style=deepai_style,
+            width=width,
+            height=height,
+            version=version.value,
+        )
 
     if success:
         console.print(f"\n✨ [bold green]Done![/bold green] Banner saved to: [cyan]{output}[/cyan]")
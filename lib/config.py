@@ -1,5 +1,6 @@
 """Application configuration with Pydantic settings"""
 
+from functools import lru_cache
 from pathlib import Path
 from typing import Literal
 
@@ -7,6 +8,11 @@ from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
+def is_multiple_of_32(value: int) -> bool:
+    """Check an image dimension is a multiple of 32 (as DeepAI requires)"""
+    return not value & 31
+
+
 class Settings(BaseSettings):
     """Application settings loaded from environment variables and .env file"""
 
@@ -18,6 +24,18 @@ class Settings(BaseSettings):
     openai_model: str = Field("gpt-4o", description="OpenAI model to use")
     openai_temperature: float = Field(0.9, ge=0.0, le=2.0, description="Temperature for prompts")
     openai_max_tokens: int = Field(1000, ge=1, le=4000, description="Max tokens for responses")
+    openai_content_token_budget: int = Field(
+        6000, ge=500, le=100_000, description="Max tokens of blog content sent per post"
+    )
+    openai_max_retries: int = Field(
+        3, ge=0, le=10, description="Retries for rate-limited or failed OpenAI requests"
+    )
+    openai_parallel_requests: int = Field(
+        1,
+        ge=1,
+        le=5,
+        description="Split prompt generation across N parallel completions (n) of one GPT request",
+    )
 
     # DeepAI Configuration
     deepai_api_url: str = "https://api.deepai.org/api/text2img"
@@ -28,6 +46,12 @@ class Settings(BaseSettings):
     deepai_retry_base_delay: int = Field(
         2, ge=1, le=10, description="Base delay in seconds for exponential backoff"
     )
+    deepai_max_concurrency: int = Field(
+        2, ge=1, le=8, description="Max concurrent DeepAI requests in batch mode"
+    )
+    deepai_max_connections_per_host: int = Field(
+        8, ge=1, le=32, description="Max open HTTP connections to each DeepAI host"
+    )
 
     # Application Defaults
     default_input_dir: Path = Path("./posts")
@@ -38,6 +62,20 @@ class Settings(BaseSettings):
     default_version: Literal["standard", "hd", "genius"] = "standard"
     default_deepai_style: str = "origami-3d-generator"
 
+    # Prompt Cache
+    cache_dir: Path = Path.home() / ".cache" / "deepai-banner"
+    prompt_cache_ttl: int = Field(
+        7 * 24 * 3600, ge=0, description="Prompt cache TTL in seconds (0 disables caching)"
+    )
+    semantic_cache_threshold: float = Field(
+        0.92, ge=0.0, le=1.0, description="Min similarity to reuse prompts of a near-duplicate post"
+    )
+    deepai_cache_ttl: int = Field(
+        7 * 24 * 3600,
+        ge=0,
+        description="Seconds to reuse the image of an identical DeepAI request (0 disables)",
+    )
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
@@ -49,21 +87,15 @@ class Settings(BaseSettings):
     @classmethod
     def validate_multiple_of_32(cls, v: int) -> int:
         """Validate dimensions are multiples of 32"""
-        if v % 32 != 0:
+        if not is_multiple_of_32(v):
             raise ValueError(f"Must be multiple of 32, got {v}")
         return v
 
 
-# Singleton instance
-_settings: Settings | None = None
-
-
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
-    """Get settings singleton (lazy loaded)"""
-    global _settings
-    if _settings is None:
-        _settings = Settings()  # type: ignore[call-arg]
-    return _settings
+    """Get settings singleton (lazy loaded, validated once per process)"""
+    return Settings()  # type: ignore[call-arg]
 
 
-__all__ = ["Settings", "get_settings"]
+__all__ = ["Settings", "get_settings", "is_multiple_of_32"]
@@ -1,6 +1,20 @@
 """DeepAI client and style management"""
 
-from lib.deepai.client import DeepAIClient
+from typing import TYPE_CHECKING, Any
+
 from lib.deepai.styles import get_style_loader
 
+if TYPE_CHECKING:
+    from lib.deepai.client import DeepAIClient
+
+
+def __getattr__(name: str) -> Any:
+    """Import DeepAIClient (and requests) on first access only"""
+    if name == "DeepAIClient":
+        from lib.deepai.client import DeepAIClient
+
+        return DeepAIClient
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 __all__ = ["DeepAIClient", "get_style_loader"]
@@ -1,15 +1,46 @@
 """DeepAI client for image generation"""
 
+import asyncio
+import contextlib
+import hashlib
+import json
+import random
+import shutil
+import threading
 import time
 import uuid
+from collections.abc import Callable
 from pathlib import Path
+from types import TracebackType
 from typing import Any, Literal
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from lib.config import get_settings
-from lib.deepai.styles import get_style_loader
+from lib.deepai.styles import DeepAIStyle, form_value, get_style_loader
 from lib.logger import logger
+from lib.prompt_cache import load_cache, save_cache
+
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib json is used when missing
+    orjson = None  # type: ignore[assignment]
+
+# Bytes read per chunk when streaming downloaded images to disk
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# HTTP statuses worth retrying (rate limiting and transient server errors)
+RETRYABLE_STATUS = frozenset({429, 500, 502, 503, 504})
+
+# Upper bound on any single retry wait, in seconds
+MAX_RETRY_DELAY = 60
+
+# How long a generated-but-not-downloaded image URL is worth retrying
+PENDING_URL_TTL = 24 * 3600
+# Short timeout for the background pre-connect; it only saves latency
+WARM_UP_TIMEOUT = 5
 
 
 class DeepAIClient:
@@ -27,9 +58,79 @@ class DeepAIClient:
         self.timeout = settings.deepai_timeout
         self.max_retries = settings.deepai_max_retries
         self.retry_base_delay = settings.deepai_retry_base_delay
+        self.max_concurrency = settings.deepai_max_concurrency
         self.style_loader = get_style_loader()
+        self._request_templates: dict[
+            tuple[Any, ...], tuple[str, DeepAIStyle | None, dict[str, str]]
+        ] = {}
+
+        # Image URLs whose download failed, so a retry can skip re-generation
+        self._pending_urls_path = settings.cache_dir / "pending_urls.json"
+        self._pending_urls: dict[str, Any] | None = None
+        self._pending_urls_lock = threading.Lock()
+
+        # Images already rendered for an identical request, reused instead of
+        # calling the API again
+        self.image_cache_ttl = settings.deepai_cache_ttl
+        self._image_cache_path = settings.cache_dir / "images.json"
+        self._image_cache: dict[str, Any] | None = None
+        self._image_cache_lock = threading.Lock()
+
+        # One connection pool shared by every request (and batch worker thread),
+        # blocking rather than opening more than the per-host limit.
+        # Transport-level retries cover read errors and retryable statuses of the
+        # idempotent image download only. urllib3 retries connect errors for every
+        # method, so those are disabled here: generate_image has its own retry
+        # loop for the POST, and stacking both would multiply the attempts.
+        self._session = requests.Session()
+        self._session.headers.update({"api-key": self.api_key})
+        download_retry = Retry(
+            total=self.max_retries,
+            connect=0,
+            backoff_factor=self.retry_base_delay,
+            status_forcelist=RETRYABLE_STATUS,
+            allowed_methods=frozenset({"GET"}),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=settings.deepai_max_connections_per_host,
+            pool_block=True,
+            max_retries=download_retry,
+        )
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
         logger.info("Initialized DeepAI client")
 
+    def __enter__(self) -> "DeepAIClient":
+        """Use the client as a context manager that owns the connection pool"""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        """Close the connection pool on exit"""
+        self.close()
+
+    def close(self) -> None:
+        """Close pooled HTTP connections"""
+        self._session.close()
+
+    def warm_up(self) -> None:
+        """Open a pooled connection to the API ahead of the first generation
+
+        Meant to run in the background while prompts are still being written,
+        so DNS and TLS setup are already done when generation starts.
+        """
+        try:
+            self._session.head(self.base_api_url, timeout=WARM_UP_TIMEOUT).close()
+            logger.debug("DeepAI connection warmed up")
+        except requests.RequestException as e:
+            logger.debug(f"DeepAI warm-up failed: {e}")
+
     def generate_image(
         self,
         prompt: str,
@@ -61,69 +162,28 @@ class DeepAIClient:
             f"(prompt: {prompt_length} chars): {prompt[:50]}..."
         )
 
-        # Load style configuration
-        style = self.style_loader.get_style(deepai_style)
-        if not style:
-            logger.warning(
-                f"[{request_id}] Unknown style '{deepai_style}', falling back to text2img"
-            )
-            endpoint = "text2img"
-            default_params = {}
-        else:
-            endpoint = style.endpoint
-            default_params = style.default_params.copy()
-
-        # Build API URL
-        api_url = f"{self.base_api_url}/{endpoint}"
-        headers = {"api-key": self.api_key}
-
-        # Build request data starting with defaults
-        data: dict[str, Any] = {
-            "text": prompt,
-            "width": str(width),
-            "height": str(height),
-        }
-
-        # Add style-specific default parameters
-        for key, value in default_params.items():
-            if key not in data:
-                data[key] = str(value).lower() if isinstance(value, bool) else str(value)
-
-        # Add extra parameters (override defaults)
-        for key, value in extra_params.items():
-            data[key] = str(value).lower() if isinstance(value, bool) else str(value)
-
-        # Handle image_generator_version parameter
-        # Generic text2img endpoint requires capitalized: "Standard", "Hd", "Genius"
-        # Style-specific endpoints require lowercase: "standard", "hd", "genius"
-        if version != "standard":
-            if endpoint == "text2img":
-                # Generic endpoint: capitalize
-                data["image_generator_version"] = version.capitalize()
-            else:
-                # Style-specific endpoints: lowercase
-                data["image_generator_version"] = version.lower()
-
-                # When using genius with style-specific endpoints, these params are required
-                if version == "genius":
-                    if "turbo" not in data:
-                        data["turbo"] = "true"
-                    if "genius_preference" not in data:
-                        data["genius_preference"] = "classic"
-
-        # Debug logging
-        logger.debug(f"[{request_id}] API URL: {api_url}")
-        logger.debug(f"[{request_id}] Style: {style.name if style else 'text2img'}")
-        logger.debug(f"[{request_id}] Request data: {data}")
+        api_url, style, base_data = self._request_template(
+            deepai_style, width, height, version, extra_params
+        )
+        data = {"text": prompt, **base_data}
+
+        # One debug record per request; loguru formats the arguments only if a
+        # sink accepts DEBUG
+        logger.debug(
+            "[{}] API URL: {} | Style: {} | Request data: {}",
+            request_id,
+            api_url,
+            style.name if style else "text2img",
+            data,
+        )
 
         # Retry loop with exponential backoff
         for attempt in range(1, self.max_retries + 1):
             start_time = time.time()
 
             try:
-                response = requests.post(
+                response = self._session.post(
                     api_url,
-                    headers=headers,
                     data=data,
                     timeout=self.timeout,
                 )
@@ -131,13 +191,21 @@ class DeepAIClient:
                 elapsed = time.time() - start_time
 
                 if response.status_code == 200:
-                    result = response.json()
+                    result = orjson.loads(response.content) if orjson else response.json()
                     image_url: str | None = result.get("output_url")
                     logger.info(
                         f"[{request_id}] Image generated successfully in {elapsed:.1f}s "
                         f"(attempt {attempt}/{self.max_retries}): {image_url}"
                     )
                     return image_url
+                elif response.status_code not in RETRYABLE_STATUS:
+                    # Client errors (bad params, auth) fail the same way on every attempt
+                    logger.error(
+                        f"[{request_id}] API request rejected after {elapsed:.1f}s - "
+                        f"Status {response.status_code}: {response.text}"
+                    )
+                    logger.error(f"[{request_id}] Request parameters: {data}")
+                    return None
                 else:
                     logger.warning(
                         f"[{request_id}] API request failed (attempt {attempt}/{self.max_retries}) "
@@ -145,8 +213,8 @@ class DeepAIClient:
                     )
 
                     if attempt < self.max_retries:
-                        delay = self.retry_base_delay * (2 ** (attempt - 1))
-                        logger.info(f"[{request_id}] Retrying in {delay}s...")
+                        delay = self._retry_delay(attempt, response.headers.get("Retry-After"))
+                        logger.info(f"[{request_id}] Retrying in {delay:.1f}s...")
                         time.sleep(delay)
                     else:
                         logger.error(f"[{request_id}] All {self.max_retries} attempts failed")
@@ -154,7 +222,8 @@ class DeepAIClient:
                         logger.error(f"[{request_id}] Request parameters: {data}")
                         return None
 
-            except requests.RequestException as e:
+            # ValueError: malformed JSON body (orjson does not raise a RequestException)
+            except (requests.RequestException, ValueError) as e:
                 elapsed = time.time() - start_time
                 logger.warning(
                     f"[{request_id}] Request exception (attempt {attempt}/{self.max_retries}) "
@@ -162,8 +231,8 @@ class DeepAIClient:
                 )
 
                 if attempt < self.max_retries:
-                    delay = self.retry_base_delay * (2 ** (attempt - 1))
-                    logger.info(f"[{request_id}] Retrying in {delay}s...")
+                    delay = self._retry_delay(attempt)
+                    logger.info(f"[{request_id}] Retrying in {delay:.1f}s...")
                     time.sleep(delay)
                 else:
                     logger.error(
@@ -173,6 +242,108 @@ class DeepAIClient:
 
         return None
 
+    def _retry_delay(self, attempt: int, retry_after: str | None = None) -> float:
+        """Compute how long to wait before the next attempt
+
+        Uses exponential backoff with +/-50% jitter, so concurrent batch
+        workers that fail together do not retry in lockstep. A numeric
+        Retry-After header from the server takes precedence.
+
+        Args:
+            attempt: Attempt number that just failed (1-based)
+            retry_after: Retry-After header value, if any
+
+        Returns:
+            Delay in seconds, capped at MAX_RETRY_DELAY
+        """
+        if retry_after and retry_after.isdigit():
+            return float(min(int(retry_after), MAX_RETRY_DELAY))
+
+        delay = min(self.retry_base_delay * (2 ** (attempt - 1)), MAX_RETRY_DELAY)
+        return min(random.uniform(delay * 0.5, delay * 1.5), MAX_RETRY_DELAY)
+
+    def _request_template(
+        self,
+        deepai_style: str,
+        width: int,
+        height: int,
+        version: str,
+        extra_params: dict[str, Any],
+    ) -> tuple[str, DeepAIStyle | None, dict[str, str]]:
+        """Build the API URL and prompt-independent form fields for a request
+
+        Templates are memoized per (style, size, version, extra params), so a
+        batch builds them once and each request only adds its prompt text.
+
+        Args:
+            deepai_style: DeepAI style slug
+            width: Image width in pixels
+            height: Image height in pixels
+            version: Generation version
+            extra_params: Additional style-specific parameters
+
+        Returns:
+            Tuple of (API URL, style or None for the text2img fallback, form fields)
+        """
+        cache_key = (
+            deepai_style,
+            width,
+            height,
+            version,
+            tuple(sorted((k, str(v)) for k, v in extra_params.items())),
+        )
+        template = self._request_templates.get(cache_key)
+        if template is not None:
+            return template
+
+        # Load style configuration
+        style = self.style_loader.get_style(deepai_style)
+        if not style:
+            logger.warning(f"Unknown style '{deepai_style}', falling back to text2img")
+            endpoint = "text2img"
+            default_params: dict[str, str] = {}
+        else:
+            endpoint = style.endpoint
+            default_params = style.default_params_str
+
+        # Build API URL
+        api_url = f"{self.base_api_url}/{endpoint}"
+
+        # Build request data starting with defaults
+        data: dict[str, str] = {
+            "width": str(width),
+            "height": str(height),
+        }
+
+        # Add style-specific default parameters (already form-encoded at load time)
+        data.update({k: v for k, v in default_params.items() if k not in data})
+
+        # Add extra parameters (override defaults)
+        for key, value in extra_params.items():
+            data[key] = form_value(value)
+
+        # Handle image_generator_version parameter
+        # Generic text2img endpoint requires capitalized: "Standard", "Hd", "Genius"
+        # Style-specific endpoints require lowercase: "standard", "hd", "genius"
+        if version != "standard":
+            if endpoint == "text2img":
+                # Generic endpoint: capitalize
+                data["image_generator_version"] = version.capitalize()
+            else:
+                # Style-specific endpoints: lowercase
+                data["image_generator_version"] = version.lower()
+
+                # When using genius with style-specific endpoints, these params are required
+                if version == "genius":
+                    if "turbo" not in data:
+                        data["turbo"] = "true"
+                    if "genius_preference" not in data:
+                        data["genius_preference"] = "classic"
+
+        template = (api_url, style, data)
+        self._request_templates[cache_key] = template
+        return template
+
     def download_image(self, url: str, output_path: Path) -> bool:
         """Download image from URL to file
 
@@ -186,19 +357,37 @@ class DeepAIClient:
         logger.info(f"Downloading image from {url} to {output_path}")
 
         try:
-            response = requests.get(url, timeout=self.timeout)
+            # PNG is already compressed; skip transfer decoding and stream to disk
+            response = self._session.get(
+                url,
+                headers={"Accept-Encoding": "identity"},
+                timeout=self.timeout,
+                stream=True,
+            )
+        except requests.RequestException as e:
+            logger.error(f"Request exception during image download: {e}")
+            return False
 
-            if response.status_code == 200:
-                output_path.write_bytes(response.content)
-                logger.info(f"Image saved successfully to {output_path}")
-                return True
-            else:
+        try:
+            if response.status_code != 200:
                 logger.error(f"Failed to download image: HTTP {response.status_code}")
                 return False
 
-        except requests.RequestException as e:
-            logger.error(f"Request exception during image download: {e}")
+            # Chunks larger than the file buffer are written straight through
+            with output_path.open("wb") as f:
+                f.writelines(response.iter_content(DOWNLOAD_CHUNK_SIZE))
+
+            logger.info(f"Image saved successfully to {output_path}")
+            return True
+
+        except (requests.RequestException, OSError) as e:
+            # Dropped connection or failed write (disk full, permissions, missing directory)
+            logger.error(f"Failed to save downloaded image to {output_path}: {e}")
+            with contextlib.suppress(OSError):
+                output_path.unlink(missing_ok=True)
             return False
+        finally:
+            response.close()
 
     def generate_and_save(
         self,
@@ -226,6 +415,29 @@ class DeepAIClient:
         """
         logger.info(f"Generating and saving image to {output_path}")
 
+        key = self._image_key(prompt, deepai_style, width, height, version, extra_params)
+
+        # Reuse the local copy of an identical earlier request
+        cached_path = self._cached_image(key)
+        if cached_path:
+            logger.info(f"Image cache hit, copying {cached_path}")
+            try:
+                if cached_path.resolve() != output_path.resolve():
+                    shutil.copyfile(cached_path, output_path)
+                return True
+            except OSError as e:
+                logger.warning(f"Failed to copy cached image {cached_path}: {e}")
+
+        # Reuse an image generated by an earlier attempt whose download failed
+        pending_url = self._pending_url(key)
+        if pending_url:
+            logger.info(f"Retrying download of previously generated image: {pending_url}")
+            downloaded = self.download_image(pending_url, output_path)
+            self._set_pending_url(key, None)
+            if downloaded:
+                self._set_cached_image(key, pending_url, output_path)
+                return True
+
         # Generate image
         image_url = self.generate_image(
             prompt, deepai_style, width, height, version, **extra_params
@@ -236,7 +448,189 @@ class DeepAIClient:
             return False
 
         # Download and save
-        return self.download_image(image_url, output_path)
+        if self.download_image(image_url, output_path):
+            self._set_cached_image(key, image_url, output_path)
+            return True
+
+        self._set_pending_url(key, image_url)
+        return False
+
+    @staticmethod
+    def _image_key(
+        prompt: str,
+        deepai_style: str,
+        width: int,
+        height: int,
+        version: str,
+        extra_params: dict[str, Any],
+    ) -> str:
+        """Build a key identifying one image request
+
+        Returns:
+            BLAKE2b hex digest of the prompt and every generation option
+        """
+        payload = json.dumps(
+            [prompt, deepai_style, width, height, version, sorted(extra_params.items())],
+            default=str,
+        )
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+    def _pending_url(self, key: str) -> str | None:
+        """Look up an unexpired image URL left by a failed download
+
+        Args:
+            key: Key from _image_key
+
+        Returns:
+            Image URL, or None if there is nothing to retry
+        """
+        with self._pending_urls_lock:
+            if self._pending_urls is None:
+                self._pending_urls = load_cache(self._pending_urls_path)
+            entry = self._pending_urls.get(key)
+
+        if not entry or time.time() - entry.get("created_at", 0) > PENDING_URL_TTL:
+            return None
+        url: str | None = entry.get("url")
+        return url
+
+    def _set_pending_url(self, key: str, url: str | None) -> None:
+        """Remember (or forget, when url is None) an image URL awaiting download
+
+        Args:
+            key: Key from _image_key
+            url: Generated image URL, or None to drop the entry
+        """
+        with self._pending_urls_lock:
+            if self._pending_urls is None:
+                self._pending_urls = load_cache(self._pending_urls_path)
+            if url is None:
+                if self._pending_urls.pop(key, None) is None:
+                    return
+            else:
+                self._pending_urls[key] = {"url": url, "created_at": time.time()}
+            save_cache(self._pending_urls, self._pending_urls_path, PENDING_URL_TTL)
+
+    def _cached_image(self, key: str) -> Path | None:
+        """Look up the local copy of an image rendered for an identical request
+
+        Args:
+            key: Key from _image_key
+
+        Returns:
+            Path of the saved image, or None if caching is disabled, the entry
+            expired or the file is gone
+        """
+        if self.image_cache_ttl <= 0:
+            return None
+
+        with self._image_cache_lock:
+            if self._image_cache is None:
+                self._image_cache = load_cache(self._image_cache_path)
+            entry = self._image_cache.get(key)
+
+        if not entry or time.time() - entry.get("created_at", 0) > self.image_cache_ttl:
+            return None
+        path = Path(entry.get("path", ""))
+        return path if path.is_file() else None
+
+    def _set_cached_image(self, key: str, url: str, output_path: Path) -> None:
+        """Remember where the image for a request was saved
+
+        Args:
+            key: Key from _image_key
+            url: Generated image URL
+            output_path: Local file the image was saved to
+        """
+        if self.image_cache_ttl <= 0:
+            return
+
+        with self._image_cache_lock:
+            if self._image_cache is None:
+                self._image_cache = load_cache(self._image_cache_path)
+            self._image_cache[key] = {
+                "url": url,
+                "path": str(output_path.resolve()),
+                "created_at": time.time(),
+            }
+            save_cache(self._image_cache, self._image_cache_path, self.image_cache_ttl)
+
+    async def async_generate_and_save(
+        self,
+        prompt: str,
+        output_path: Path,
+        deepai_style: str = "origami-3d-generator",
+        width: int = 1792,
+        height: int = 1024,
+        version: Literal["standard", "hd", "genius"] = "standard",
+        **extra_params: Any,
+    ) -> bool:
+        """Generate and save image without blocking the event loop
+
+        Runs generate_and_save in a worker thread so several banners can be
+        awaited together with asyncio.gather. Callers are responsible for
+        bounding concurrency (see max_concurrency).
+
+        Args:
+            prompt: Text prompt
+            output_path: Output file path
+            deepai_style: DeepAI style slug
+            width: Image width
+            height: Image height
+            version: Generation version
+            **extra_params: Additional style-specific parameters
+
+        Returns:
+            True if successful, False otherwise
+        """
+        return await asyncio.to_thread(
+            self.generate_and_save,
+            prompt,
+            output_path,
+            deepai_style,
+            width,
+            height,
+            version,
+            **extra_params,
+        )
+
+    async def agenerate_batch(
+        self,
+        prompts: list[str],
+        output_paths: list[Path],
+        on_complete: Callable[[int, bool], None] | None = None,
+        **generate_kwargs: Any,
+    ) -> list[bool | BaseException]:
+        """Generate and save several images concurrently
+
+        At most max_concurrency requests are in flight at once; the rest wait
+        on a semaphore, so a large batch does not trip DeepAI rate limits.
+
+        Args:
+            prompts: Text prompts
+            output_paths: Output file path for each prompt
+            on_complete: Called with (index, success) as each image finishes
+            **generate_kwargs: Options shared by every image (style, size, version)
+
+        Returns:
+            One result per prompt: True/False, or the exception raised
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def _generate_one(index: int, prompt: str, output_path: Path) -> bool:
+            async with semaphore:
+                success = await self.async_generate_and_save(
+                    prompt=prompt, output_path=output_path, **generate_kwargs
+                )
+            if on_complete is not None:
+                on_complete(index, success)
+            return success
+
+        tasks = [
+            _generate_one(index, prompt, output_path)
+            for index, (prompt, output_path) in enumerate(zip(prompts, output_paths, strict=True))
+        ]
+        return await asyncio.gather(*tasks, return_exceptions=True)
 
 
 __all__ = ["DeepAIClient"]
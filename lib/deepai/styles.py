@@ -1,15 +1,32 @@
 """DeepAI style configuration loader"""
 
-from dataclasses import dataclass
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from functools import cache
+from operator import attrgetter
 from pathlib import Path
+from types import MappingProxyType
 from typing import Any
 
 import yaml
 
 from lib.logger import logger
 
+# libyaml-backed loader parses ~10x faster; pure-Python fallback otherwise
+_YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 
-@dataclass
+
+def form_value(value: Any) -> str:
+    """Render a parameter as a DeepAI form field value (booleans lowercase)"""
+    # Exact type checks: strings (the common case) pass through untouched
+    if type(value) is str:
+        return value
+    if type(value) is bool:
+        return "true" if value else "false"
+    return str(value)
+
+
+@dataclass(frozen=True, slots=True)
 class DeepAIStyle:
     """DeepAI style configuration"""
 
@@ -18,20 +35,21 @@ class DeepAIStyle:
     description: str
     endpoint: str
     default_params: dict[str, Any]
+    # Form-encoded default_params, computed once when the style is loaded
+    default_params_str: dict[str, str] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        """Precompute the form field values sent with every request"""
+        params_str = {k: form_value(v) for k, v in self.default_params.items()}
+        object.__setattr__(self, "default_params_str", params_str)
 
 
 class DeepAIStyleLoader:
     """Loads and manages DeepAI style configurations from YAML"""
 
-    _instance: "DeepAIStyleLoader | None" = None
-    _styles: dict[str, DeepAIStyle] = {}
-
-    def __new__(cls) -> "DeepAIStyleLoader":
-        """Singleton pattern to cache loaded styles"""
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-            cls._instance._load_styles()
-        return cls._instance
+    def __init__(self) -> None:
+        """Load styles (use get_style_loader() for the shared instance)"""
+        self._load_styles()
 
     def _load_styles(self) -> None:
         """Load styles from YAML file with local override support"""
@@ -41,19 +59,26 @@ class DeepAIStyleLoader:
 
         if local_path.exists():
             logger.info(f"Loading DeepAI styles from {local_path}")
-            self._styles = self._load_yaml(local_path)
+            styles = self._load_yaml(local_path)
         elif default_path.exists():
             logger.info(f"Loading DeepAI styles from {default_path}")
-            self._styles = self._load_yaml(default_path)
+            styles = self._load_yaml(default_path)
         else:
             logger.warning("No deepai_styles.yaml found, using fallback defaults")
-            self._styles = self._get_fallback_styles()
+            styles = self._get_fallback_styles()
+
+        # Read-only view: the shared loader is used from batch worker threads
+        self._styles: Mapping[str, DeepAIStyle] = MappingProxyType(styles)
+
+        # Styles never change after loading, so sort once for every listing
+        self._sorted_styles = tuple(sorted(self._styles.values(), key=attrgetter("name")))
+        self._sorted_slugs = tuple(sorted(self._styles))
 
     def _load_yaml(self, path: Path) -> dict[str, DeepAIStyle]:
         """Load YAML file and parse into DeepAIStyle objects"""
         try:
             with open(path, encoding="utf-8") as f:
-                data = yaml.safe_load(f)
+                data = yaml.load(f, Loader=_YamlLoader)
 
                 if not data or "styles" not in data:
                     logger.error(f"Invalid format in {path}, using fallback")
@@ -106,21 +131,21 @@ class DeepAIStyleLoader:
         """
         return self._styles.get(slug)
 
-    def list_styles(self) -> list[DeepAIStyle]:
-        """Get list of all available styles
+    def list_styles(self) -> tuple[DeepAIStyle, ...]:
+        """Get all available styles
 
         Returns:
-            List of DeepAIStyle objects sorted by name
+            DeepAIStyle objects sorted by name (shared, read-only)
         """
-        return sorted(self._styles.values(), key=lambda s: s.name)
+        return self._sorted_styles
 
-    def get_style_slugs(self) -> list[str]:
-        """Get list of style slugs
+    def get_style_slugs(self) -> tuple[str, ...]:
+        """Get all style slugs
 
         Returns:
-            List of style slugs sorted alphabetically
+            Style slugs sorted alphabetically (shared, read-only)
         """
-        return sorted(self._styles.keys())
+        return self._sorted_slugs
 
     def style_exists(self, slug: str) -> bool:
         """Check if a style exists
@@ -134,16 +159,10 @@ class DeepAIStyleLoader:
         return slug in self._styles
 
 
-# Singleton instance for easy access
-_loader: DeepAIStyleLoader | None = None
-
-
+@cache
 def get_style_loader() -> DeepAIStyleLoader:
     """Get the singleton DeepAIStyleLoader instance"""
-    global _loader
-    if _loader is None:
-        _loader = DeepAIStyleLoader()
-    return _loader
+    return DeepAIStyleLoader()
 
 
-__all__ = ["DeepAIStyle", "DeepAIStyleLoader", "get_style_loader"]
+__all__ = ["DeepAIStyle", "DeepAIStyleLoader", "form_value", "get_style_loader"]
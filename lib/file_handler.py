@@ -1,12 +1,19 @@
 """File handling utilities for markdown and output files"""
 
+import os
+import uuid
+from collections.abc import Iterator
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 
 import yaml
 
 from lib.logger import logger
 
+# libyaml-backed loader parses ~10x faster; pure-Python fallback otherwise
+_YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 
 class MarkdownHandler:
     """Handles markdown file operations"""
@@ -21,46 +28,76 @@ class MarkdownHandler:
         Returns:
             List of markdown file paths
         """
-        if not directory.exists():
+        # One stat that also rejects files, so scandir never has to fail
+        if not os.path.isdir(directory):
             logger.warning(f"Directory does not exist: {directory}")
             return []
 
-        markdown_files = sorted(directory.glob("*.md"))
+        markdown_files = sorted(MarkdownHandler.iter_markdown_files(directory))
         logger.debug(f"Found {len(markdown_files)} markdown files in {directory}")
         return markdown_files
 
+    @staticmethod
+    def iter_markdown_files(directory: Path) -> Iterator[Path]:
+        """Lazily yield markdown files in directory (unsorted)
+
+        Uses os.scandir so entries are filtered by name before any stat call
+        and only matching entries become Path objects.
+
+        Args:
+            directory: Directory to search
+
+        Yields:
+            Markdown file paths in directory order
+        """
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.name.endswith(".md") and entry.is_file():
+                    yield directory / entry.name
+
     @staticmethod
     def parse_markdown_post(file_path: Path) -> tuple[dict, str]:
         """Parse markdown file with YAML front matter
 
+        Results are cached per (path, mtime, size), so an unchanged file is
+        read and parsed only once per process; treat the returned dict as
+        read-only.
+
         Args:
             file_path: Path to markdown file
 
         Returns:
             Tuple of (front_matter_dict, body_text)
         """
-        logger.debug(f"Parsing markdown file: {file_path}")
+        stat = file_path.stat()
+        return _parse_markdown_cached(str(file_path), stat.st_mtime_ns, stat.st_size)
+
+
+@lru_cache(maxsize=256)
+def _parse_markdown_cached(path: str, mtime_ns: int, size: int) -> tuple[dict, str]:
+    """Read and parse a markdown post (cache key includes mtime and size)"""
+    logger.debug(f"Parsing markdown file: {path}")
 
-        content = file_path.read_text(encoding="utf-8")
+    content = Path(path).read_text(encoding="utf-8")
 
-        # Check for YAML front matter
-        if content.startswith("---"):
-            parts = content.split("---", 2)
-            if len(parts) >= 3:
-                # Front matter exists
-                front_matter_str = parts[1].strip()
-                body = parts[2].strip()
+    # Check for YAML front matter, closed by the next line starting with '---'
+    if content.startswith("---"):
+        end = content.find("\n---", 3)
+        if end != -1:
+            # Front matter exists
+            front_matter_str = content[3:end].strip()
+            body = content[end + 4 :].strip()
 
-                try:
-                    front_matter = yaml.safe_load(front_matter_str) or {}
-                except yaml.YAMLError as e:
-                    logger.warning(f"Failed to parse YAML front matter: {e}")
-                    front_matter = {}
+            try:
+                front_matter = yaml.load(front_matter_str, Loader=_YamlLoader) or {}
+            except yaml.YAMLError as e:
+                logger.warning(f"Failed to parse YAML front matter: {e}")
+                front_matter = {}
 
-                return front_matter, body
+            return front_matter, body
 
-        # No front matter
-        return {}, content.strip()
+    # No front matter
+    return {}, content.strip()
 
 
 class OutputHandler:
@@ -90,12 +127,14 @@ class OutputHandler:
         """Generate multiple output paths for batch generation
 
         Uses timestamp-based naming: {stem}_banner_{timestamp}_{seq}.png
+        The auto-generated timestamp carries a short random suffix so batches
+        started within the same second never share file names.
 
         Args:
             input_file: Source markdown file
             output_dir: Output directory
             count: Number of files to generate
-            timestamp: Optional timestamp string (auto-generated if None)
+            timestamp: Optional batch identifier (auto-generated if None)
 
         Returns:
             List of output paths with sequential naming
@@ -103,18 +142,16 @@ class OutputHandler:
         Example:
             >>> generate_batch_output_paths(Path("my-post.md"), Path("out"), 3)
             [
-                Path("out/my-post_banner_20251030_143022_01.png"),
-                Path("out/my-post_banner_20251030_143022_02.png"),
-                Path("out/my-post_banner_20251030_143022_03.png"),
+                Path("out/my-post_banner_20251030_143022_3f9a1c_01.png"),
+                Path("out/my-post_banner_20251030_143022_3f9a1c_02.png"),
+                Path("out/my-post_banner_20251030_143022_3f9a1c_03.png"),
             ]
         """
         if timestamp is None:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            timestamp = f"{datetime.now():%Y%m%d_%H%M%S}_{uuid.uuid4().hex[:6]}"
 
-        paths = []
-        for seq in range(1, count + 1):
-            filename = f"{input_file.stem}_banner_{timestamp}_{seq:02d}.png"
-            paths.append(output_dir / filename)
+        prefix = f"{input_file.stem}_banner_{timestamp}"
+        paths = [output_dir / f"{prefix}_{seq:02d}.png" for seq in range(1, count + 1)]
 
         logger.debug(f"Generated {count} batch output paths with timestamp {timestamp}")
         return paths
@@ -129,5 +166,19 @@ class OutputHandler:
         path.parent.mkdir(parents=True, exist_ok=True)
         logger.debug(f"Ensured output directory exists: {path.parent}")
 
+    @staticmethod
+    def ensure_output_directories(paths: list[Path]) -> None:
+        """Create the parent directories of several output paths
+
+        Each distinct parent is created once, so a batch sharing one output
+        directory costs a single mkdir.
+
+        Args:
+            paths: Output file paths
+        """
+        for parent in {path.parent for path in paths}:
+            parent.mkdir(parents=True, exist_ok=True)
+            logger.debug(f"Ensured output directory exists: {parent}")
+
 
 __all__ = ["MarkdownHandler", "OutputHandler"]
@@ -1,17 +1,212 @@
 """OpenAI GPT client for prompt generation"""
 
-import sys
+import asyncio
+import json
+import re
+import time
+from collections.abc import AsyncIterator, Sequence
+from functools import cache
+from itertools import islice
+from types import TracebackType
+from typing import Any
 
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 
 from lib.config import get_settings
 from lib.logger import logger
 from lib.prompts import get_prompt_loader
 
+try:
+    import tiktoken
+except ImportError:  # optional; token counts are estimated from length when missing
+    tiktoken = None  # type: ignore[assignment, unused-ignore]
+
+_JSON_DECODER = json.JSONDecoder()
+
+# One prompt per line of GPT output: leading list numbering ("1.", "2)", "3 -",
+# "4-"), surrounding whitespace and quotes are outside the captured group
+_PROMPT_LINE = re.compile(
+    r'^[ \t]*(?:\d{1,2}[ \t]*[.)-][ \t]*)?[" \t]*(.*?)[" \t\r]*$', re.MULTILINE
+)
+
+
+# OpenAI Batch API polling: first wait, and cap for the doubling backoff (seconds)
+BATCH_POLL_INITIAL = 10
+BATCH_POLL_MAX = 300
+BATCH_TERMINAL_STATUSES = frozenset({"completed", "failed", "expired", "cancelled"})
+
+# Rough characters per token of English prose, used when tiktoken is missing
+CHARS_PER_TOKEN = 4
+
+
+@cache
+def _encoding(model: str) -> Any:
+    """tiktoken encoding for a model, falling back to the GPT-4o encoding
+
+    Returns:
+        The encoding, or None if tiktoken is missing or cannot load it (its BPE
+        files are downloaded on first use, which fails offline)
+    """
+    if tiktoken is None:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        logger.warning("tiktoken unavailable, estimating token counts: {}", e)
+        return None
+
+
+def _fit_content(content: str, budget: int, model: str) -> str:
+    """Trim post content to a token budget, keeping its opening and closing
+
+    Args:
+        content: Blog post content
+        budget: Maximum tokens of content to send
+        model: OpenAI model name (selects the tokenizer)
+
+    Returns:
+        The content unchanged if it fits, else its first 3/4 and last 1/4 of the
+        budget joined by an ellipsis line
+    """
+    encoding = _encoding(model)
+    if encoding is None:
+        max_chars = budget * CHARS_PER_TOKEN
+        if len(content) <= max_chars:
+            return content
+        return f"{content[: max_chars * 3 // 4]}\n...\n{content[-(max_chars // 4) :]}"
+
+    tokens = encoding.encode(content)
+    if len(tokens) <= budget:
+        return content
+    head = encoding.decode(tokens[: budget * 3 // 4])
+    tail = encoding.decode(tokens[-(budget // 4) :])
+    return f"{head}\n...\n{tail}"
+
+
+def _parse_prompts(raw_output: str, limit: int) -> list[str]:
+    """Parse prompts from a JSON-mode completion, or a numbered list otherwise
+
+    Args:
+        raw_output: Completion text
+        limit: Maximum number of prompts to return
+
+    Returns:
+        Parsed prompts
+    """
+    try:
+        data = json.loads(raw_output)
+    except ValueError:
+        return _parse_numbered_list(raw_output, limit)
+
+    prompts = data.get("prompts") if isinstance(data, dict) else None
+    if not isinstance(prompts, list):
+        return _parse_numbered_list(raw_output, limit)
+    return [text for text in (str(prompt).strip() for prompt in prompts) if text][:limit]
+
+
+def _parse_numbered_list(raw_output: str, limit: int) -> list[str]:
+    """Parse a numbered list of prompts from GPT output
+
+    Args:
+        raw_output: Completion text, one prompt per line
+        limit: Maximum number of prompts to return
+
+    Returns:
+        Prompts with list numbering and surrounding quotes removed
+    """
+    prompts = (match.group(1) for match in _PROMPT_LINE.finditer(raw_output))
+    return list(islice(filter(None, prompts), limit))
+
+
+class _PromptStreamParser:
+    """Incrementally extract prompts from one streamed completion choice"""
+
+    __slots__ = ("json_mode", "limit", "_buffer", "_pos", "_done", "_emitted")
+
+    def __init__(self, json_mode: bool, limit: int) -> None:
+        """Create a parser
+
+        Args:
+            json_mode: Completion is a {"prompts": [...]} object, not a numbered list
+            limit: Maximum number of prompts the completion is expected to hold
+        """
+        self.json_mode = json_mode
+        self.limit = limit
+        self._buffer = ""
+        # JSON mode: position after the last parsed array item (0 until "[" is seen)
+        self._pos = 0
+        self._done = False
+        self._emitted = 0
+
+    def feed(self, text: str) -> list[str]:
+        """Add streamed text and return prompts completed by it"""
+        self._buffer += text
+        prompts = self._drain_json() if self.json_mode else self._drain_lines()
+        self._emitted += len(prompts)
+        return prompts
+
+    def close(self) -> list[str]:
+        """Return prompts left in the buffer once the stream has ended"""
+        if self.json_mode:
+            # The model ignored JSON mode: fall back to parsing the whole text
+            return [] if self._emitted else _parse_prompts(self._buffer, self.limit)
+        prompts = _parse_numbered_list(self._buffer, 1)
+        self._buffer = ""
+        return prompts
+
+    def _drain_lines(self) -> list[str]:
+        """Parse every complete line of a numbered list"""
+        *lines, self._buffer = self._buffer.split("\n")
+        return [prompt for line in lines for prompt in _parse_numbered_list(line, 1)]
+
+    def _drain_json(self) -> list[str]:
+        """Parse every complete string of the prompts array"""
+        prompts: list[str] = []
+        buffer = self._buffer
+        if not self._pos:
+            start = buffer.find("[")
+            if start < 0:
+                return prompts
+            self._pos = start + 1
+
+        while not self._done:
+            pos = self._pos
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos >= len(buffer):
+                break
+            if buffer[pos] == "]":
+                self._done = True
+                break
+            try:
+                value, self._pos = _JSON_DECODER.raw_decode(buffer, pos)
+            except ValueError:
+                break  # item not fully streamed yet
+            text = str(value).strip()
+            if text:
+                prompts.append(text)
+        return prompts
+
 
 class GPTClient:
     """Client for OpenAI GPT API interactions"""
 
+    __slots__ = (
+        "api_key",
+        "max_retries",
+        "client",
+        "model",
+        "temperature",
+        "max_tokens",
+        "parallel_requests",
+        "content_token_budget",
+        "prompt_loader",
+        "_async_client",
+    )
+
     def __init__(self, api_key: str | None = None) -> None:
         """Initialize GPT client
 
@@ -20,12 +215,66 @@ class GPTClient:
         """
         settings = get_settings()
         self.api_key = api_key or settings.openai_api_key
-        self.client = OpenAI(api_key=self.api_key)
+        # The SDK retries rate limits (429), 5xx, timeouts and connection errors
+        # with jittered exponential backoff, honouring Retry-After
+        self.max_retries = settings.openai_max_retries
+        self.client = OpenAI(api_key=self.api_key, max_retries=self.max_retries)
         self.model = settings.openai_model
         self.temperature = settings.openai_temperature
         self.max_tokens = settings.openai_max_tokens
+        self.parallel_requests = settings.openai_parallel_requests
+        self.content_token_budget = settings.openai_content_token_budget
         self.prompt_loader = get_prompt_loader()
-        logger.info(f"Initialized GPT client with model: {self.model}")
+        self._async_client: AsyncOpenAI | None = None
+        logger.info("Initialized GPT client with model: {}", self.model)
+
+    @property
+    def async_client(self) -> AsyncOpenAI:
+        """Async OpenAI client, created on first use by the async methods"""
+        if self._async_client is None:
+            self._async_client = AsyncOpenAI(api_key=self.api_key, max_retries=self.max_retries)
+        return self._async_client
+
+    def __enter__(self) -> "GPTClient":
+        """Use the client as a context manager that owns the connection pool"""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        """Close the connection pool on exit"""
+        self.close()
+
+    async def __aenter__(self) -> "GPTClient":
+        """Use the client as an async context manager owning both connection pools"""
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        """Close both connection pools on exit"""
+        await self.aclose()
+        self.close()
+
+    def close(self) -> None:
+        """Close pooled HTTP connections of the sync client"""
+        self.client.close()
+
+    async def aclose(self) -> None:
+        """Close pooled HTTP connections of the async client
+
+        Its connections belong to the running event loop, so the next event
+        loop gets a fresh async client.
+        """
+        async_client, self._async_client = self._async_client, None
+        if async_client is not None:
+            await async_client.close()
 
     def generate_prompts(
         self,
@@ -33,6 +282,7 @@ class GPTClient:
         content: str,
         deepai_style_slug: str,
         num_prompts: int = 10,
+        samples: int = 1,
     ) -> list[str]:
         """Generate style-aware banner prompts
 
@@ -41,81 +291,329 @@ class GPTClient:
             content: Full blog post content
             deepai_style_slug: DeepAI style slug (e.g., 'origami-3d-generator')
             num_prompts: Number of prompts to generate (default: 10)
+            samples: Completions sampled in parallel from one request, each
+                contributing a share of the prompts (default: 1)
+
+        Returns:
+            List of generated prompts
+
+        Raises:
+            openai.OpenAIError: If the request still fails after retries
+            ValueError: If the response contains no prompts
+        """
+        request = self._build_request(title, content, deepai_style_slug, num_prompts, samples)
+        try:
+            response = self.client.chat.completions.create(**request)
+            return self._parse_response(response, num_prompts)
+        except Exception as e:
+            logger.error("Error calling OpenAI API: {}", e)
+            raise
+
+    async def agenerate_prompts(
+        self,
+        title: str,
+        content: str,
+        deepai_style_slug: str,
+        num_prompts: int = 10,
+    ) -> list[str]:
+        """Generate prompts from parallel completions of a single GPT request
+
+        Asks for up to parallel_requests choices (n) in one call, each listing a
+        share of num_prompts, so wall time is bounded by one short completion
+        while the blog content is sent and billed only once.
+
+        Args:
+            title: Blog post title
+            content: Full blog post content
+            deepai_style_slug: DeepAI style slug (e.g., 'origami-3d-generator')
+            num_prompts: Total number of prompts to generate (default: 10)
 
         Returns:
             List of generated prompts
+
+        Raises:
+            openai.OpenAIError: If the request still fails after retries
+            ValueError: If the response contains no prompts
         """
+        try:
+            return await self._acreate_prompts(title, content, deepai_style_slug, num_prompts)
+        except Exception as e:
+            logger.error("Error calling OpenAI API: {}", e)
+            raise
+
+    async def agenerate_prompts_batch(
+        self,
+        posts: Sequence[tuple[str, str]],
+        deepai_style_slug: str,
+        num_prompts: int = 10,
+        max_concurrency: int = 4,
+    ) -> list[list[str] | BaseException]:
+        """Generate prompts for several blog posts concurrently
+
+        Args:
+            posts: (title, content) pairs
+            deepai_style_slug: DeepAI style slug shared by every post
+            num_prompts: Number of prompts per post (default: 10)
+            max_concurrency: Max OpenAI requests in flight at once (default: 4)
+
+        Returns:
+            Prompt list per post, in input order, or the exception that post raised
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def _generate_one(title: str, content: str) -> list[str]:
+            async with semaphore:
+                return await self._acreate_prompts(title, content, deepai_style_slug, num_prompts)
+
+        return await asyncio.gather(
+            *(_generate_one(title, content) for title, content in posts),
+            return_exceptions=True,
+        )
+
+    def generate_prompts_via_batch(
+        self,
+        posts: Sequence[tuple[str, str]],
+        deepai_style_slug: str,
+        num_prompts: int = 10,
+    ) -> list[list[str]]:
+        """Generate prompts for several posts through the OpenAI Batch API
+
+        Half the price of regular requests, but results may take up to 24 hours,
+        so this blocks while polling and suits offline prefetching only.
+
+        Args:
+            posts: (title, content) pairs
+            deepai_style_slug: DeepAI style slug shared by every post
+            num_prompts: Number of prompts per post (default: 10)
+
+        Returns:
+            Prompt list per post, in input order (empty for posts whose request failed)
+
+        Raises:
+            RuntimeError: If the batch does not complete
+        """
+        lines = []
+        for post_id, (title, content) in enumerate(posts):
+            request = self._build_request(title, content, deepai_style_slug, num_prompts, 1)
+            # Batch bodies are sent as-is, so extra_body fields go in directly
+            body = {k: v for k, v in request.items() if k != "extra_body"}
+            body.update(request["extra_body"])
+            lines.append(
+                json.dumps(
+                    {
+                        "custom_id": str(post_id),
+                        "method": "POST",
+                        "url": "/v1/chat/completions",
+                        "body": body,
+                    },
+                    ensure_ascii=False,
+                )
+            )
+
+        input_file = self.client.files.create(
+            file=("banner-prompts.jsonl", "\n".join(lines).encode("utf-8")), purpose="batch"
+        )
+        batch = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+        )
+        logger.info("Submitted OpenAI batch {} with {} requests", batch.id, len(lines))
+
+        delay: float = BATCH_POLL_INITIAL
+        while batch.status not in BATCH_TERMINAL_STATUSES:
+            time.sleep(delay)
+            delay = min(delay * 2, BATCH_POLL_MAX)
+            batch = self.client.batches.retrieve(batch.id)
+            logger.debug("OpenAI batch {} status: {}", batch.id, batch.status)
+
+        if batch.status != "completed" or not batch.output_file_id:
+            raise RuntimeError(f"OpenAI batch {batch.id} ended with status {batch.status}")
+
+        results: list[list[str]] = [[] for _ in posts]
+        output = self.client.files.content(batch.output_file_id).text
+        for line in output.splitlines():
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            body = (item.get("response") or {}).get("body") or {}
+            choices = body.get("choices") or []
+            if not choices:
+                logger.warning(
+                    "Batch request {} failed: {}", item.get("custom_id"), item.get("error")
+                )
+                continue
+            raw_output = choices[0].get("message", {}).get("content") or ""
+            results[int(item["custom_id"])] = _parse_prompts(raw_output, num_prompts)
+
         logger.info(
-            f"Generating {num_prompts} prompts for '{title}' in style '{deepai_style_slug}'"
+            "OpenAI batch {} returned prompts for {} posts", batch.id, sum(map(bool, results))
         )
+        return results
+
+    async def astream_prompts(
+        self,
+        title: str,
+        content: str,
+        deepai_style_slug: str,
+        num_prompts: int = 10,
+    ) -> AsyncIterator[str]:
+        """Stream prompts as soon as each one is complete
 
-        # Get style description from DeepAIStyleLoader
-        from lib.deepai import get_style_loader
+        Same request as agenerate_prompts, sent with stream=True, so callers can
+        show progress before the whole completion has been generated.
 
-        style_loader = get_style_loader()
-        deepai_style = style_loader.get_style(deepai_style_slug)
-        style_description = (
-            deepai_style.description if deepai_style else "General-purpose image generation"
+        Args:
+            title: Blog post title
+            content: Full blog post content
+            deepai_style_slug: DeepAI style slug (e.g., 'origami-3d-generator')
+            num_prompts: Total number of prompts to generate (default: 10)
+
+        Yields:
+            Generated prompts, in the order they complete
+
+        Raises:
+            openai.OpenAIError: If the request still fails after retries
+            ValueError: If the response contains no prompts
+        """
+        samples = min(self.parallel_requests, num_prompts)
+        request = self._build_request(title, content, deepai_style_slug, num_prompts, samples)
+        json_mode = "response_format" in request
+        parsers: dict[int, _PromptStreamParser] = {}
+        prompts: list[str] = []
+        stream = None
+        try:
+            stream = await self.async_client.chat.completions.create(**request, stream=True)
+            async for chunk in stream:
+                for choice in chunk.choices:
+                    text = choice.delta.content
+                    if not text:
+                        continue
+                    parser = parsers.get(choice.index)
+                    if parser is None:
+                        parser = parsers[choice.index] = _PromptStreamParser(json_mode, num_prompts)
+                    for prompt in parser.feed(text)[: num_prompts - len(prompts)]:
+                        prompts.append(prompt)
+                        yield prompt
+                if len(prompts) >= num_prompts:
+                    break  # Enough prompts; the rest of the completion is not read
+        except Exception as e:
+            logger.error("Error calling OpenAI API: {}", e)
+            raise
+        finally:
+            if stream is not None:
+                await stream.close()
+
+        for parser in parsers.values():
+            for prompt in parser.close()[: num_prompts - len(prompts)]:
+                prompts.append(prompt)
+                yield prompt
+
+        if not prompts:
+            raise ValueError("Empty response from OpenAI")
+
+        logger.info("Generated {} prompts", len(prompts))
+
+    async def _acreate_prompts(
+        self, title: str, content: str, deepai_style_slug: str, num_prompts: int
+    ) -> list[str]:
+        """Request and parse prompts with the async client (errors propagate)"""
+        samples = min(self.parallel_requests, num_prompts)
+        request = self._build_request(title, content, deepai_style_slug, num_prompts, samples)
+        response = await self.async_client.chat.completions.create(**request)
+        return self._parse_response(response, num_prompts)
+
+    def _build_request(
+        self,
+        title: str,
+        content: str,
+        deepai_style_slug: str,
+        num_prompts: int,
+        samples: int,
+    ) -> dict[str, Any]:
+        """Build chat completion arguments for a prompt generation request
+
+        Returns:
+            Keyword arguments for chat.completions.create
+        """
+        logger.info(
+            "Generating {} prompts for '{}' in style '{}'", num_prompts, title, deepai_style_slug
         )
 
-        # Load base template from YAML
-        prompts_dict = self.prompt_loader._prompts.get("base", {})
-        system_prompt = prompts_dict.get("system", "").strip()
-        user_template = prompts_dict.get("user", "").strip()
+        system_prompt, user_template, style_description = (
+            self.prompt_loader.get_base_prompts_for_style(deepai_style_slug)
+        )
 
         if not system_prompt or not user_template:
             logger.error("Base template not found in prompts.yaml")
             raise ValueError("Base template not found in prompts.yaml")
 
         # Format user prompt with all variables (YAML uses 'count' not 'num_prompts')
-        user_prompt = user_template.format(
+        user_prompt = self.prompt_loader.format_user_prompt(
+            user_template,
+            title,
+            _fit_content(content, self.content_token_budget, self.model),
             style=deepai_style_slug,
             style_description=style_description,
-            title=title,
-            content=content,
-            count=num_prompts,
+            count=-(-num_prompts // samples),
         )
 
+        # Static instructions first, post-specific text last: OpenAI caches
+        # matching prompt prefixes server-side, and the cache key keeps requests
+        # for the same style on one cache shard
         messages = [
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_prompt},
         ]
 
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,  # type: ignore[arg-type]
-                temperature=self.temperature,
-                max_tokens=self.max_tokens,
-            )
+        request: dict[str, Any] = {
+            "model": self.model,
+            "messages": messages,
+            "temperature": self.temperature,
+            "max_tokens": self.max_tokens,
+            "n": samples,
+            "extra_body": {"prompt_cache_key": f"banner-prompts:{deepai_style_slug}"},
+        }
+        # JSON mode requires the prompt to ask for JSON, so custom templates that
+        # still ask for a numbered list keep working
+        if "json" in system_prompt.lower():
+            request["response_format"] = {"type": "json_object"}
+        return request
 
-            raw_output = response.choices[0].message.content
-            if not raw_output:
-                raise ValueError("Empty response from OpenAI")
-
-            # Parse numbered list into list of strings
-            prompts = []
-            for line in raw_output.splitlines():
-                line = line.strip()
-                if not line:
-                    continue
-                # Remove leading number and separators like "1.", "1)", "1-"
-                for i in range(1, num_prompts + 1):
-                    prefixes = [f"{i}.", f"{i})", f"{i} -", f"{i}-"]
-                    for prefix in prefixes:
-                        if line.startswith(prefix):
-                            line = line[len(prefix) :].strip()
-                            break
-                # Remove quotes
-                prompts.append(line.strip('" '))
-
-            logger.info(f"Generated {len(prompts)} prompts")
-            return prompts[:num_prompts]  # Return requested count
+    @staticmethod
+    def _parse_response(response: Any, num_prompts: int) -> list[str]:
+        """Extract prompts from a chat completion
 
-        except Exception as e:
-            logger.error(f"Error calling OpenAI API: {e}")
-            print(f"Error calling OpenAI API: {e}")
-            sys.exit(1)
+        Args:
+            response: Chat completion returned by the OpenAI client
+            num_prompts: Number of prompts requested
+
+        Returns:
+            Prompts parsed from every choice
+
+        Raises:
+            ValueError: If the completion contains no prompts
+        """
+        usage = getattr(response, "usage", None)
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached_tokens = getattr(details, "cached_tokens", None)
+        if isinstance(cached_tokens, int):
+            logger.debug("Prompt tokens served from OpenAI cache: {}", cached_tokens)
+
+        # Parse each choice, stopping at the requested count
+        prompts: list[str] = []
+        for choice in response.choices:
+            if len(prompts) == num_prompts:
+                break
+            raw_output = choice.message.content
+            if raw_output:
+                prompts += _parse_prompts(raw_output, num_prompts - len(prompts))
+
+        if not prompts:
+            raise ValueError("Empty response from OpenAI")
+
+        logger.info("Generated {} prompts", len(prompts))
+        return prompts
 
 
 __all__ = ["GPTClient"]
@@ -1,6 +1,7 @@
 """Centralized logging configuration using Loguru"""
 
 import sys
+from functools import cache
 from pathlib import Path
 
 from loguru import logger
@@ -8,7 +9,7 @@ from loguru import logger
 # Remove default handler
 logger.remove()
 
-# Console handler with colors
+# Console handler with colors; enqueue=True hands records to a background writer thread
 logger.add(
     sys.stderr,
     format=(
@@ -19,18 +20,30 @@ logger.add(
     ),
     level="INFO",
     colorize=True,
+    enqueue=True,
 )
 
-# File handler for persistent logs
-log_dir = Path("logs")
-log_dir.mkdir(exist_ok=True)
 
-logger.add(
-    log_dir / "app.log",
-    rotation="10 MB",
-    retention="7 days",
-    level="DEBUG",
-    format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}",
-)
+@cache
+def configure_file_logging(log_dir: Path = Path("logs")) -> None:
+    """Add the persistent DEBUG log file
+
+    Called by the CLI rather than on import, so importing the library creates
+    no files and DEBUG records are skipped unless a sink wants them. Like the
+    console sink, writes happen on loguru's background thread.
+
+    Args:
+        log_dir: Directory for app.log (created if missing)
+    """
+    log_dir.mkdir(exist_ok=True)
+    logger.add(
+        log_dir / "app.log",
+        rotation="10 MB",
+        retention="7 days",
+        level="DEBUG",
+        format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}",
+        enqueue=True,
+    )
+
 
-__all__ = ["logger"]
+__all__ = ["configure_file_logging", "logger"]
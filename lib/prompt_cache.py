@@ -0,0 +1,150 @@
+"""Persistent on-disk cache for GPT-generated banner prompts"""
+
+import hashlib
+import json
+import time
+from pathlib import Path
+from typing import Any
+
+from lib.logger import logger
+
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib json is used when missing
+    orjson = None  # type: ignore[assignment]
+
+# Entries kept per cache file; the oldest are dropped beyond this
+MAX_CACHE_ENTRIES = 1000
+
+
+def hash_prompt(style: str, title: str, body: str) -> str:
+    """Build a cache key for a blog post and style
+
+    Args:
+        style: DeepAI style slug
+        title: Blog post title
+        body: Blog post body
+
+    Returns:
+        SHA-256 hex digest identifying the (style, title, body) combination
+    """
+    payload = json.dumps([style, title, body], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def load_cache(path: Path) -> dict[str, Any]:
+    """Load the prompt cache from disk
+
+    Args:
+        path: Cache file path
+
+    Returns:
+        Cache dictionary (empty if missing or unreadable)
+    """
+    if not path.exists():
+        return {}
+
+    try:
+        raw = path.read_bytes()
+        data = orjson.loads(raw) if orjson else json.loads(raw)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable prompt cache {path}: {e}")
+        return {}
+
+    return data if isinstance(data, dict) else {}
+
+
+def prune_cache(cache: dict[str, Any], ttl: int = 0, max_entries: int = MAX_CACHE_ENTRIES) -> None:
+    """Drop expired entries and keep only the newest max_entries, in place
+
+    Args:
+        cache: Cache dictionary whose entries carry a created_at timestamp
+        ttl: Time-to-live in seconds (0 keeps entries regardless of age)
+        max_entries: Maximum number of entries to keep
+    """
+    if ttl > 0:
+        cutoff = time.time() - ttl
+        for key in [k for k, entry in cache.items() if entry.get("created_at", 0) < cutoff]:
+            del cache[key]
+
+    if len(cache) > max_entries:
+        newest = sorted(cache, key=lambda k: cache[k].get("created_at", 0), reverse=True)
+        for key in newest[max_entries:]:
+            del cache[key]
+
+
+def save_cache(cache: dict[str, Any], path: Path, ttl: int = 0) -> None:
+    """Prune and write the prompt cache to disk atomically
+
+    Args:
+        cache: Cache dictionary (pruned in place, see prune_cache)
+        path: Cache file path
+        ttl: Time-to-live in seconds used to drop expired entries (0 keeps them)
+    """
+    prune_cache(cache, ttl)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        if orjson:
+            payload = orjson.dumps(cache)
+        else:
+            payload = json.dumps(cache, ensure_ascii=False).encode("utf-8")
+        tmp_path.write_bytes(payload)
+        tmp_path.replace(path)
+    except OSError as e:
+        logger.warning(f"Failed to save prompt cache {path}: {e}")
+
+
+def get_cached_prompts(cache: dict[str, Any], key: str, count: int, ttl: int) -> list[str] | None:
+    """Look up cached prompts
+
+    Args:
+        cache: Cache dictionary
+        key: Cache key from hash_prompt
+        count: Number of prompts needed
+        ttl: Time-to-live in seconds (0 disables the cache)
+
+    Returns:
+        First `count` cached prompts, or None on miss/expiry
+    """
+    if ttl <= 0:
+        return None
+
+    entry = cache.get(key)
+    if not entry:
+        return None
+
+    if time.time() - entry.get("created_at", 0) > ttl:
+        logger.debug(f"Prompt cache entry expired: {key[:12]}")
+        return None
+
+    prompts: list[str] = entry.get("prompts", [])
+    if len(prompts) < count:
+        return None
+
+    logger.info(f"Prompt cache hit: {key[:12]}")
+    return prompts[:count]
+
+
+def set_cached_prompts(
+    cache: dict[str, Any], key: str, prompts: list[str], **metadata: Any
+) -> None:
+    """Store prompts in the cache dictionary
+
+    Args:
+        cache: Cache dictionary
+        key: Cache key from hash_prompt
+        prompts: Generated prompts
+        **metadata: Extra fields stored with the entry (e.g., style, terms)
+    """
+    cache[key] = {"prompts": prompts, "created_at": time.time(), **metadata}
+
+
+__all__ = [
+    "get_cached_prompts",
+    "hash_prompt",
+    "load_cache",
+    "prune_cache",
+    "save_cache",
+    "set_cached_prompts",
+]
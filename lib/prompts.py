@@ -1,25 +1,59 @@
 """Prompt template loader for GPT interactions"""
 
+import string
+from functools import cache, lru_cache
 from pathlib import Path
 from typing import Any
 
 import yaml
 
+from lib.deepai.styles import get_style_loader
 from lib.logger import logger
 
+# libyaml-backed loader parses ~10x faster; pure-Python fallback otherwise
+_YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+_FORMATTER = string.Formatter()
+
+# Parsed prompt files keyed on (path, mtime_ns, size); an edited file gets a new key
+_parsed_files: dict[tuple[str, int, int], dict[str, Any]] = {}
+
+
+@lru_cache(maxsize=64)
+def _compile_template(template: str) -> tuple[tuple[str, str | None], ...] | None:
+    """Split a template into (literal, field name) pairs once
+
+    Args:
+        template: str.format template
+
+    Returns:
+        Pairs to join, or None if a field needs full str.format handling
+        (format specs, conversions, positional or attribute access)
+    """
+    parts: list[tuple[str, str | None]] = []
+    for literal, field, spec, conversion in _FORMATTER.parse(template):
+        if field is not None and (spec or conversion or not field.isidentifier()):
+            return None
+        parts.append((literal, field))
+    return tuple(parts)
+
 
 class PromptLoader:
     """Loads and manages GPT prompt templates from YAML files"""
 
-    _instance: "PromptLoader | None" = None
-    _prompts: dict[str, Any] = {}
-
-    def __new__(cls) -> "PromptLoader":
-        """Singleton pattern to cache loaded prompts"""
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-            cls._instance._load_prompts()
-        return cls._instance
+    __slots__ = ("_prompts", "_templates", "_style_prompts")
+
+    def __init__(self) -> None:
+        """Load prompts (use get_prompt_loader() for the shared instance)"""
+        self._prompts: dict[str, Any] = {}
+        self._load_prompts()
+        # Stripped (system, user) templates per section, and per-style base prompts
+        self._templates: dict[str, tuple[str, str]] = {
+            name: (section.get("system", "").strip(), section.get("user", "").strip())
+            for name, section in self._prompts.items()
+            if isinstance(section, dict)
+        }
+        self._style_prompts: dict[str, tuple[str, str, str]] = {}
 
     def _load_prompts(self) -> None:
         """Load prompts from YAML file with local override support"""
@@ -28,30 +62,46 @@ class PromptLoader:
         default_path = Path("prompts.yaml")
 
         if local_path.exists():
-            logger.info(f"Loading prompts from {local_path}")
+            logger.info("Loading prompts from {}", local_path)
             self._prompts = self._load_yaml(local_path)
         elif default_path.exists():
-            logger.info(f"Loading prompts from {default_path}")
+            logger.info("Loading prompts from {}", default_path)
             self._prompts = self._load_yaml(default_path)
         else:
             logger.warning("No prompts.yaml found, using fallback defaults")
             self._prompts = self._get_fallback_prompts()
 
     def _load_yaml(self, path: Path) -> dict[str, Any]:
-        """Load YAML file and return parsed content"""
+        """Load YAML file and return parsed content (reused while the file is unchanged)"""
         try:
-            with open(path, encoding="utf-8") as f:
-                data = yaml.safe_load(f)
-                return data if data else {}
+            stat = path.stat()
+            key = (str(path.resolve()), stat.st_mtime_ns, stat.st_size)
+            if key in _parsed_files:
+                return _parsed_files[key]
+
+            # libyaml decodes the raw bytes itself, skipping the text-mode layer
+            data = yaml.load(path.read_bytes(), Loader=_YamlLoader)
         except Exception as e:
-            logger.error(f"Error loading {path}: {e}")
+            logger.error("Error loading {}: {}", path, e)
             return self._get_fallback_prompts()
 
+        if data is None:
+            data = {}
+        elif not isinstance(data, dict):
+            logger.error("Error loading {}: expected a mapping of prompt sections", path)
+            return self._get_fallback_prompts()
+
+        _parsed_files[key] = data
+        return data
+
     def _get_fallback_prompts(self) -> dict[str, Any]:
         """Fallback prompts if YAML file is missing"""
         return {
             "base": {
-                "system": "You are a creative image prompt generator for DeepAI. Generate style-aware banner prompts.",
+                "system": (
+                    "You are a creative image prompt generator for DeepAI. Generate style-aware "
+                    'banner prompts. Return only a JSON object: {"prompts": ["<prompt>", ...]}'
+                ),
                 "user": "Style: {style}\nTitle: {title}\n\nContent:\n{content}\n\nGenerate {count} cinematic prompts.",
             },
             "simple": {
@@ -70,10 +120,7 @@ class PromptLoader:
         Returns:
             Tuple of (system_prompt, user_template)
         """
-        simple = self._prompts.get("simple", {})
-        system = simple.get("system", "").strip()
-        user = simple.get("user", "").strip()
-        return system, user
+        return self._templates.get("simple", ("", ""))
 
     def get_origami_prompts(self) -> tuple[str, str]:
         """Get origami prompt templates
@@ -81,10 +128,7 @@ class PromptLoader:
         Returns:
             Tuple of (system_prompt, user_template)
         """
-        origami = self._prompts.get("origami", {})
-        system = origami.get("system", "").strip()
-        user = origami.get("user", "").strip()
-        return system, user
+        return self._templates.get("origami", ("", ""))
 
     def get_base_prompts(self) -> tuple[str, str]:
         """Get base prompt templates
@@ -92,10 +136,24 @@ class PromptLoader:
         Returns:
             Tuple of (system_prompt, user_template)
         """
-        base = self._prompts.get("base", {})
-        system = base.get("system", "").strip()
-        user = base.get("user", "").strip()
-        return system, user
+        return self._templates.get("base", ("", ""))
+
+    def get_base_prompts_for_style(self, style_slug: str) -> tuple[str, str, str]:
+        """Get base prompt templates with the description of a DeepAI style
+
+        Args:
+            style_slug: DeepAI style slug (e.g., 'origami-3d-generator')
+
+        Returns:
+            Tuple of (system_prompt, user_template, style_description)
+        """
+        prompts = self._style_prompts.get(style_slug)
+        if prompts is None:
+            style = get_style_loader().get_style(style_slug)
+            description = style.description if style else "General-purpose image generation"
+            prompts = (*self.get_base_prompts(), description)
+            self._style_prompts[style_slug] = prompts
+        return prompts
 
     def format_user_prompt(self, template: str, title: str, content: str, **kwargs: Any) -> str:
         """Format user prompt template with variables
@@ -109,19 +167,20 @@ class PromptLoader:
         Returns:
             Formatted prompt string
         """
-        return template.format(title=title, content=content, **kwargs)
-
+        parts = _compile_template(template)
+        if parts is None:
+            return template.format(title=title, content=content, **kwargs)
 
-# Singleton instance for easy access
-_loader: PromptLoader | None = None
+        values = {"title": title, "content": content, **kwargs}
+        return "".join(
+            literal if field is None else literal + str(values[field]) for literal, field in parts
+        )
 
 
+@cache
 def get_prompt_loader() -> PromptLoader:
     """Get the singleton PromptLoader instance"""
-    global _loader
-    if _loader is None:
-        _loader = PromptLoader()
-    return _loader
+    return PromptLoader()
 
 
 __all__ = ["PromptLoader", "get_prompt_loader"]
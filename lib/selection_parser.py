@@ -1,5 +1,24 @@
 """Selection parser utility for multi-select prompts"""
 
+import re
+
+# A range hyphen is either bare ("1-5") or spaced on both sides ("1 - 5")
+_RANGE_SEP = r"(?:-|\s+-\s+)"
+
+# One whole token per selection, tried in order: a valid range, any other token
+# with a range hyphen (malformed, or half-open like "3-"), a lone number, and
+# anything else. Numeric tokens must end at a separator, so "5a-" or "3x-4" are
+# never read as a number plus leftovers.
+_TOKEN = re.compile(
+    rf"(\d+){_RANGE_SEP}(\d+)(?=[\s,]|$)"
+    rf"|([^\s,]*?){_RANGE_SEP}([^\s,]*)"
+    r"|(\d+)(?=[\s,]|$)"
+    r"|([^\s,]+)"
+)
+
+# Above this many items the index set is used instead of a per-item bytearray
+MAX_BYTEARRAY_COUNT = 10**6
+
 
 def parse_selection(input_str: str, max_count: int) -> list[int]:
     """Parse user selection string into list of indices
@@ -20,33 +39,25 @@ def parse_selection(input_str: str, max_count: int) -> list[int]:
     Raises:
         ValueError: If input contains invalid numbers or ranges
     """
+    # Fast path: a lone number (the common retry case) needs no tokenizing
+    stripped = input_str.strip()
+    if stripped.isdecimal():
+        idx = int(stripped) - 1
+        if 0 <= idx < max_count:
+            return [idx]
+
+    # A byte per item yields a sorted result without hashing or sorting;
+    # huge counts fall back to a set to keep memory bounded
+    marks: bytearray | None = bytearray(max_count) if max_count <= MAX_BYTEARRAY_COUNT else None
     indices: set[int] = set()
 
-    # Normalize separators: replace spaces around commas/hyphens, then spaces -> commas
-    # But preserve hyphens for ranges
-    input_str = input_str.replace(" - ", "-")  # "1 - 5" -> "1-5"
-    input_str = input_str.replace(" ", ",")  # "1 3 5" -> "1,3,5"
-
-    for part in input_str.split(","):
-        part = part.strip()
-        if not part:
-            continue
-
-        if "-" in part:
-            # Range: "1-5"
-            try:
-                start, end = part.split("-", 1)
-                start = start.strip()
-                end = end.strip()
-
-                # Skip if either side is empty
-                if not start or not end:
-                    continue
-
-                start_idx = int(start) - 1  # Convert to 0-based
-                end_idx = int(end) - 1
-            except ValueError as e:
-                raise ValueError(f"Invalid range format: {part}") from e
+    for m in _TOKEN.finditer(input_str):
+        start, end, left, right, number, other = m.groups()
+        if start is not None:
+            # Range: "1-5" (whitespace around the hyphen is allowed)
+            part = f"{start}-{end}"
+            start_idx = int(start) - 1  # Convert to 0-based
+            end_idx = int(end) - 1
 
             if start_idx < 0 or end_idx >= max_count:
                 raise ValueError(f"Range out of bounds (1-{max_count}): {part}")
@@ -54,19 +65,28 @@ def parse_selection(input_str: str, max_count: int) -> list[int]:
             if start_idx > end_idx:
                 raise ValueError(f"Invalid range (start > end): {part}")
 
-            indices.update(range(start_idx, end_idx + 1))
-        else:
-            # Single number
-            try:
-                idx = int(part) - 1  # Convert to 0-based
-            except ValueError as e:
-                raise ValueError(f"Invalid number: {part}") from e
-
+            if marks is not None:
+                marks[start_idx : end_idx + 1] = b"\x01" * (end_idx - start_idx + 1)
+            else:
+                indices.update(range(start_idx, end_idx + 1))
+        elif number is not None:
+            idx = int(number) - 1  # Convert to 0-based
             if idx < 0 or idx >= max_count:
-                raise ValueError(f"Number out of range (1-{max_count}): {int(part)}")
-
-            indices.add(idx)
+                raise ValueError(f"Number out of range (1-{max_count}): {int(number)}")
+
+            if marks is not None:
+                marks[idx] = 1
+            else:
+                indices.add(idx)
+        elif left is not None:
+            # Half-open ranges like "3-" are ignored; anything else is malformed
+            if left and right:
+                raise ValueError(f"Invalid range format: {left}-{right}")
+        else:
+            raise ValueError(f"Invalid number: {other}")
 
+    if marks is not None:
+        return [i for i, mark in enumerate(marks) if mark]
     return sorted(indices)
 
 
@@ -0,0 +1,97 @@
+"""Near-duplicate lookup over the prompt cache using term-vector cosine similarity"""
+
+import math
+import re
+import time
+from collections import Counter
+from typing import Any
+
+from lib.logger import logger
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+# Only the opening of the post is compared, which is enough to identify drafts
+BODY_PREFIX_CHARS = 2000
+
+
+def term_vector(title: str, body: str) -> dict[str, int]:
+    """Build a term-frequency vector for a blog post
+
+    Args:
+        title: Blog post title
+        body: Blog post body
+
+    Returns:
+        Mapping of lowercase word -> count
+    """
+    text = f"{title}\n{body[:BODY_PREFIX_CHARS]}".lower()
+    return dict(Counter(_WORD_RE.findall(text)))
+
+
+def cosine_similarity(a: dict[str, int], b: dict[str, int]) -> float:
+    """Cosine similarity between two term vectors
+
+    Args:
+        a: First term vector
+        b: Second term vector
+
+    Returns:
+        Similarity in [0, 1] (0 if either vector is empty)
+    """
+    if not a or not b:
+        return 0.0
+
+    if len(a) > len(b):
+        a, b = b, a
+    dot = sum(count * b.get(term, 0) for term, count in a.items())
+    norm = math.sqrt(sum(c * c for c in a.values())) * math.sqrt(sum(c * c for c in b.values()))
+    return dot / norm
+
+
+def find_similar_prompts(
+    cache: dict[str, Any],
+    style: str,
+    vector: dict[str, int],
+    count: int,
+    ttl: int,
+    threshold: float,
+) -> list[str] | None:
+    """Find cached prompts for the most similar post in the same style
+
+    Args:
+        cache: Prompt cache dictionary (see lib.prompt_cache)
+        style: DeepAI style slug the prompts were generated for
+        vector: Term vector of the current post
+        count: Number of prompts needed
+        ttl: Time-to-live in seconds (0 disables the cache)
+        threshold: Minimum cosine similarity to accept a match
+
+    Returns:
+        First `count` prompts of the best match, or None if nothing is close enough
+    """
+    if ttl <= 0:
+        return None
+
+    now = time.time()
+    best_score = threshold
+    best_prompts: list[str] | None = None
+
+    for entry in cache.values():
+        if entry.get("style") != style or "terms" not in entry:
+            continue
+        if now - entry.get("created_at", 0) > ttl or len(entry.get("prompts", [])) < count:
+            continue
+
+        score = cosine_similarity(vector, entry["terms"])
+        if score >= best_score:
+            best_score = score
+            best_prompts = entry["prompts"]
+
+    if best_prompts is None:
+        return None
+
+    logger.info(f"Semantic prompt cache hit (similarity {best_score:.3f})")
+    return best_prompts[:count]
+
+
+__all__ = ["cosine_similarity", "find_similar_prompts", "term_vector"]
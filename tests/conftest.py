@@ -6,10 +6,14 @@ import pytest
 
 
 @pytest.fixture
-def mock_env_vars(monkeypatch: pytest.MonkeyPatch) -> None:
-    """Mock environment variables for testing"""
+def mock_env_vars(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    """Mock environment variables for testing (with a throwaway cache directory)"""
+    from lib.config import get_settings
+
     monkeypatch.setenv("OPENAI_API_KEY", "sk-test" + "x" * 40)
     monkeypatch.setenv("DEEPAI_API_KEY", "test-deepai" + "x" * 20)
+    monkeypatch.setenv("CACHE_DIR", str(tmp_path / "cache"))
+    get_settings.cache_clear()
 
 
 @pytest.fixture
@@ -76,6 +76,21 @@ def test_get_settings_singleton(mock_env_vars: None) -> None:
     assert settings1 is settings2
 
 
+def test_get_settings_cache_clear_reloads(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that clearing the settings cache picks up a changed environment"""
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test" + "x" * 40)
+    monkeypatch.setenv("DEEPAI_API_KEY", "test-deepai" + "x" * 20)
+
+    from lib.config import get_settings
+
+    get_settings.cache_clear()
+    monkeypatch.setenv("DEEPAI_TIMEOUT", "90")
+    try:
+        assert get_settings().deepai_timeout == 90
+    finally:
+        get_settings.cache_clear()
+
+
 def test_settings_temperature_validation(monkeypatch: pytest.MonkeyPatch) -> None:
     """Test temperature must be between 0 and 2"""
     monkeypatch.setenv("OPENAI_API_KEY", "sk-test" + "x" * 40)
@@ -86,3 +101,13 @@ def test_settings_temperature_validation(monkeypatch: pytest.MonkeyPatch) -> Non
 
     with pytest.raises(ValidationError):
         Settings()  # type: ignore[call-arg]
+
+
+def test_is_multiple_of_32() -> None:
+    """Test the shared dimension check"""
+    from lib.config import is_multiple_of_32
+
+    assert is_multiple_of_32(1792)
+    assert is_multiple_of_32(1024)
+    assert not is_multiple_of_32(1000)
+    assert not is_multiple_of_32(33)
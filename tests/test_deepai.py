@@ -1,8 +1,11 @@
 """Tests for DeepAI client module"""
 
+from collections.abc import Iterator
 from pathlib import Path
 from unittest.mock import Mock, patch
 
+import pytest
+
 
 def test_deepai_client_initialization(mock_env_vars: None) -> None:
     """Test DeepAI client initialization"""
@@ -13,6 +16,61 @@ def test_deepai_client_initialization(mock_env_vars: None) -> None:
     assert client.api_key.startswith("test-deepai")
     assert client.base_api_url == "https://api.deepai.org/api"
     assert client.timeout == 60
+    assert client._session.headers["api-key"] == client.api_key
+
+
+def test_deepai_client_context_manager_closes_session(mock_env_vars: None) -> None:
+    """Test the client closes its connection pool when used as a context manager"""
+    from lib.deepai import DeepAIClient
+
+    with patch("lib.deepai.client.requests.Session.close") as mock_close:
+        with DeepAIClient() as client:
+            assert isinstance(client, DeepAIClient)
+        mock_close.assert_called_once()
+
+
+def test_warm_up_swallows_connection_errors(mock_env_vars: None) -> None:
+    """Test warming up the connection pool never raises"""
+    import requests
+
+    from lib.deepai import DeepAIClient
+
+    client = DeepAIClient()
+    with patch.object(
+        client._session, "head", side_effect=requests.ConnectionError("offline")
+    ) as mock_head:
+        client.warm_up()
+
+    mock_head.assert_called_once_with(client.base_api_url, timeout=5)
+
+
+def test_deepai_client_retries_downloads_only(mock_env_vars: None) -> None:
+    """Test the pooled adapter retries idempotent GETs but never the generation POST"""
+    from urllib3.exceptions import ConnectTimeoutError, MaxRetryError
+
+    from lib.deepai import DeepAIClient
+
+    client = DeepAIClient()
+    retry = client._session.get_adapter("https://api.deepai.org").max_retries
+
+    assert retry.total == client.max_retries
+    assert 503 in retry.status_forcelist
+    assert retry.is_retry("GET", 503)
+    assert not retry.is_retry("POST", 503)
+
+    # urllib3 ignores allowed_methods for connect errors, so those must not retry
+    with pytest.raises(MaxRetryError):
+        retry.increment(method="POST", url="/api/x", error=ConnectTimeoutError())
+
+
+def test_deepai_client_bounds_connections_per_host(mock_env_vars: None) -> None:
+    """Test the pool blocks instead of opening more connections than allowed"""
+    from lib.deepai import DeepAIClient
+
+    adapter = DeepAIClient()._session.get_adapter("https://api.deepai.org")
+
+    assert adapter._pool_maxsize == 8
+    assert adapter._pool_block is True
 
 
 def test_deepai_client_custom_api_key() -> None:
@@ -25,13 +83,14 @@ def test_deepai_client_custom_api_key() -> None:
     assert client.api_key == custom_key
 
 
-@patch("lib.deepai.client.requests.post")
+@patch("lib.deepai.client.requests.Session.post")
 def test_generate_image_success(mock_post: Mock, mock_env_vars: None) -> None:
     """Test successful image generation with default style"""
     from lib.deepai import DeepAIClient
 
     mock_response = Mock()
     mock_response.status_code = 200
+    mock_response.content = b'{"output_url": "https://example.com/image.jpg"}'
     mock_response.json.return_value = {"output_url": "https://example.com/image.jpg"}
     mock_post.return_value = mock_response
 
@@ -52,7 +111,32 @@ def test_generate_image_success(mock_post: Mock, mock_env_vars: None) -> None:
     assert "origami-3d-generator" in call_args[0][0]
 
 
-@patch("lib.deepai.client.requests.post")
+@patch("lib.deepai.client.requests.Session.post")
+def test_generate_image_reuses_request_template(mock_post: Mock, mock_env_vars: None) -> None:
+    """Test repeated requests with the same options only swap the prompt text"""
+    from lib.deepai import DeepAIClient
+
+    mock_response = Mock()
+    mock_response.status_code = 200
+    mock_response.content = b'{"output_url": "https://example.com/image.jpg"}'
+    mock_response.json.return_value = {"output_url": "https://example.com/image.jpg"}
+    mock_post.return_value = mock_response
+
+    client = DeepAIClient()
+    client.generate_image("first", deepai_style="origami-3d-generator", version="genius")
+    client.generate_image("second", deepai_style="origami-3d-generator", version="genius")
+
+    first, second = (c.kwargs["data"] for c in mock_post.call_args_list)
+    assert first["text"] == "first"
+    assert second["text"] == "second"
+    assert {k: v for k, v in first.items() if k != "text"} == {
+        k: v for k, v in second.items() if k != "text"
+    }
+    assert first["image_generator_version"] == "genius"
+    assert len(client._request_templates) == 1
+
+
+@patch("lib.deepai.client.requests.Session.post")
 def test_generate_image_api_error(mock_post: Mock, mock_env_vars: None) -> None:
     """Test image generation with API error"""
     from lib.deepai import DeepAIClient
@@ -66,16 +150,53 @@ def test_generate_image_api_error(mock_post: Mock, mock_env_vars: None) -> None:
     url = client.generate_image("test prompt")
 
     assert url is None
+    mock_post.assert_called_once()
+
+
+@patch("lib.deepai.client.time.sleep")
+@patch("lib.deepai.client.requests.Session.post")
+def test_generate_image_retries_transient_error(
+    mock_post: Mock, mock_sleep: Mock, mock_env_vars: None
+) -> None:
+    """Test a 503 is retried, honouring the Retry-After header"""
+    from lib.deepai import DeepAIClient
+
+    busy = Mock(status_code=503, text="Service Unavailable", headers={"Retry-After": "7"})
+    ok = Mock(status_code=200)
+    ok.content = b'{"output_url": "https://example.com/image.jpg"}'
+    ok.json.return_value = {"output_url": "https://example.com/image.jpg"}
+    mock_post.side_effect = [busy, ok]
+
+    client = DeepAIClient()
+    url = client.generate_image("test prompt")
+
+    assert url == "https://example.com/image.jpg"
+    assert mock_post.call_count == 2
+    mock_sleep.assert_called_once_with(7)
+
+
+def test_retry_delay_is_jittered_and_capped(mock_env_vars: None) -> None:
+    """Test backoff spreads retries around the exponential delay and never exceeds the cap"""
+    from lib.deepai.client import MAX_RETRY_DELAY, DeepAIClient
+
+    client = DeepAIClient()
+    base = client.retry_base_delay
 
+    delays = {client._retry_delay(2) for _ in range(20)}
+    assert all(base * 2 * 0.5 <= d <= base * 2 * 1.5 for d in delays)
+    assert len(delays) > 1
+    assert client._retry_delay(20) <= MAX_RETRY_DELAY
+    assert client._retry_delay(1, "3600") == MAX_RETRY_DELAY
 
-@patch("lib.deepai.client.requests.get")
+
+@patch("lib.deepai.client.requests.Session.get")
 def test_download_image_success(mock_get: Mock, mock_env_vars: None, tmp_path: Path) -> None:
     """Test successful image download"""
     from lib.deepai import DeepAIClient
 
     mock_response = Mock()
     mock_response.status_code = 200
-    mock_response.content = b"fake image data"
+    mock_response.iter_content.return_value = [b"fake ", b"image data"]
     mock_get.return_value = mock_response
 
     client = DeepAIClient()
@@ -86,9 +207,11 @@ def test_download_image_success(mock_get: Mock, mock_env_vars: None, tmp_path: P
     assert result is True
     assert output_path.exists()
     assert output_path.read_bytes() == b"fake image data"
+    assert mock_get.call_args[1]["stream"] is True
+    mock_response.close.assert_called_once()
 
 
-@patch("lib.deepai.client.requests.get")
+@patch("lib.deepai.client.requests.Session.get")
 def test_download_image_failure(mock_get: Mock, mock_env_vars: None, tmp_path: Path) -> None:
     """Test image download failure"""
     from lib.deepai import DeepAIClient
@@ -106,6 +229,61 @@ def test_download_image_failure(mock_get: Mock, mock_env_vars: None, tmp_path: P
     assert not output_path.exists()
 
 
+@patch("lib.deepai.client.requests.Session.get")
+def test_download_image_interrupted_removes_partial_file(
+    mock_get: Mock, mock_env_vars: None, tmp_path: Path
+) -> None:
+    """Test a dropped connection mid-stream leaves no truncated image"""
+    import requests
+
+    from lib.deepai import DeepAIClient
+
+    def broken_stream(chunk_size: int) -> Iterator[bytes]:
+        yield b"partial"
+        raise requests.ConnectionError("connection reset")
+
+    mock_response = Mock()
+    mock_response.status_code = 200
+    mock_response.iter_content.side_effect = broken_stream
+    mock_get.return_value = mock_response
+
+    client = DeepAIClient()
+    output_path = tmp_path / "test.png"
+
+    result = client.download_image("https://example.com/image.jpg", output_path)
+
+    assert result is False
+    assert not output_path.exists()
+
+
+@patch("lib.deepai.client.requests.Session.get")
+def test_download_image_write_failure_returns_false(
+    mock_get: Mock, mock_env_vars: None, tmp_path: Path
+) -> None:
+    """Test a failed disk write returns False and leaves no truncated image"""
+    from lib.deepai import DeepAIClient
+
+    def disk_full(chunk_size: int) -> Iterator[bytes]:
+        yield b"partial"
+        raise OSError(28, "No space left on device")
+
+    mock_response = Mock()
+    mock_response.status_code = 200
+    mock_response.iter_content.side_effect = disk_full
+    mock_get.return_value = mock_response
+
+    client = DeepAIClient()
+    output_path = tmp_path / "test.png"
+
+    assert client.download_image("https://example.com/image.jpg", output_path) is False
+    assert not output_path.exists()
+
+    # Opening the file fails outright when its directory is missing
+    missing_dir_path = tmp_path / "missing" / "test.png"
+    assert client.download_image("https://example.com/image.jpg", missing_dir_path) is False
+    assert mock_response.close.call_count == 2
+
+
 @patch("lib.deepai.DeepAIClient.download_image")
 @patch("lib.deepai.DeepAIClient.generate_image")
 def test_generate_and_save_success(
@@ -149,3 +327,120 @@ def test_generate_and_save_generation_fails(
     )
 
     assert result is False
+
+
+@patch("lib.deepai.DeepAIClient.download_image")
+@patch("lib.deepai.DeepAIClient.generate_image")
+def test_generate_and_save_retry_reuses_generated_url(
+    mock_generate: Mock, mock_download: Mock, mock_env_vars: None, tmp_path: Path
+) -> None:
+    """Test a failed download is retried without generating the image again"""
+    from lib.deepai import DeepAIClient
+
+    mock_generate.return_value = "https://example.com/generated.jpg"
+    mock_download.side_effect = [False, True]
+    output_path = tmp_path / "banner.png"
+
+    assert DeepAIClient().generate_and_save("test prompt", output_path) is False
+    # A fresh client (e.g. the user re-running the command) picks the URL up from disk
+    assert DeepAIClient().generate_and_save("test prompt", output_path) is True
+
+    mock_generate.assert_called_once()
+    assert mock_download.call_count == 2
+    assert mock_download.call_args.args[0] == "https://example.com/generated.jpg"
+
+
+@patch("lib.deepai.DeepAIClient.download_image")
+@patch("lib.deepai.DeepAIClient.generate_image")
+def test_generate_and_save_reuses_cached_image(
+    mock_generate: Mock, mock_download: Mock, mock_env_vars: None, tmp_path: Path
+) -> None:
+    """Test an identical request copies the earlier image instead of calling the API"""
+    from lib.deepai import DeepAIClient
+
+    first_path = tmp_path / "first.png"
+    second_path = tmp_path / "second.png"
+    mock_generate.return_value = "https://example.com/generated.jpg"
+    mock_download.side_effect = lambda url, path: path.write_bytes(b"png") or True
+
+    assert DeepAIClient().generate_and_save("test prompt", first_path) is True
+    assert DeepAIClient().generate_and_save("test prompt", second_path) is True
+
+    mock_generate.assert_called_once()
+    assert second_path.read_bytes() == b"png"
+
+    # Disabling the cache renders the image again
+    client = DeepAIClient()
+    client.image_cache_ttl = 0
+    assert client.generate_and_save("test prompt", second_path) is True
+    assert mock_generate.call_count == 2
+
+
+@patch("lib.deepai.DeepAIClient.generate_and_save")
+def test_async_generate_and_save_runs_concurrently(
+    mock_generate_and_save: Mock, mock_env_vars: None, tmp_path: Path
+) -> None:
+    """Test async_generate_and_save delegates to generate_and_save for gather"""
+    import asyncio
+
+    from lib.deepai import DeepAIClient
+
+    mock_generate_and_save.side_effect = [True, False]
+
+    client = DeepAIClient()
+
+    async def run() -> list[bool]:
+        return await asyncio.gather(
+            client.async_generate_and_save("prompt 1", tmp_path / "1.png"),
+            client.async_generate_and_save("prompt 2", tmp_path / "2.png", version="hd"),
+        )
+
+    results = asyncio.run(run())
+
+    assert sorted(results) == [False, True]
+    assert mock_generate_and_save.call_count == 2
+    assert client.max_concurrency == 2
+
+
+@patch("lib.deepai.DeepAIClient.generate_and_save")
+def test_agenerate_batch_bounds_concurrency(
+    mock_generate_and_save: Mock, mock_env_vars: None, tmp_path: Path
+) -> None:
+    """Test agenerate_batch keeps at most max_concurrency requests in flight"""
+    import asyncio
+    import threading
+    import time
+
+    from lib.deepai import DeepAIClient
+
+    lock = threading.Lock()
+    in_flight = 0
+    peak = 0
+
+    def fake_generate(*args: object, **kwargs: object) -> bool:
+        nonlocal in_flight, peak
+        with lock:
+            in_flight += 1
+            peak = max(peak, in_flight)
+        time.sleep(0.02)
+        with lock:
+            in_flight -= 1
+        return args[0] != "prompt 3"
+
+    mock_generate_and_save.side_effect = fake_generate
+    completed: list[tuple[int, bool]] = []
+
+    client = DeepAIClient()
+    prompts = [f"prompt {i}" for i in range(5)]
+    paths = [tmp_path / f"{i}.png" for i in range(5)]
+
+    results = asyncio.run(
+        client.agenerate_batch(
+            prompts, paths, on_complete=lambda i, ok: completed.append((i, ok)), width=512
+        )
+    )
+
+    assert results == [True, True, True, False, True]
+    assert sorted(completed) == [(0, True), (1, True), (2, True), (3, False), (4, True)]
+    assert peak <= client.max_concurrency
+    assert mock_generate_and_save.call_args.args[3] == 512
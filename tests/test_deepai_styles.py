@@ -2,7 +2,7 @@
 
 from unittest.mock import Mock, patch
 
-from lib.deepai.styles import DeepAIStyle, DeepAIStyleLoader, get_style_loader
+from lib.deepai.styles import DeepAIStyle, DeepAIStyleLoader, form_value, get_style_loader
 
 
 def test_deepai_style_dataclass() -> None:
@@ -125,3 +125,37 @@ def test_style_endpoint_format() -> None:
         # Endpoint should match slug for most cases
         assert isinstance(style.endpoint, str)
         assert len(style.endpoint) > 0
+
+
+def test_style_loader_list_styles_is_memoized() -> None:
+    """Test that repeated listings reuse the list sorted at load time"""
+    loader = get_style_loader()
+
+    assert loader.list_styles() is loader.list_styles()
+    assert loader.get_style_slugs() == tuple(sorted(s.slug for s in loader.list_styles()))
+
+
+def test_style_default_params_precomputed_as_form_values() -> None:
+    """Test default params are form-encoded once when the style is built"""
+    style = DeepAIStyle(
+        slug="test",
+        name="Test",
+        description="Test style",
+        endpoint="test",
+        default_params={"turbo": True, "steps": 30, "genius_preference": "classic"},
+    )
+
+    assert style.default_params_str == {
+        "turbo": "true",
+        "steps": "30",
+        "genius_preference": "classic",
+    }
+
+
+def test_form_value_coercion() -> None:
+    """Test form values pass strings through and lowercase booleans"""
+    value = "classic"
+    assert form_value(value) is value
+    assert form_value(False) == "false"
+    assert form_value(1) == "1"
+    assert form_value(0.5) == "0.5"
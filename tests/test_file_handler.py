@@ -31,6 +31,30 @@ def test_find_markdown_files_empty_directory(tmp_path: Path) -> None:
     assert files == []
 
 
+def test_find_markdown_files_missing_or_not_directory(tmp_path: Path) -> None:
+    """Test a missing directory or a file path yields no markdown files"""
+    from lib.file_handler import MarkdownHandler
+
+    not_a_dir = tmp_path / "post.md"
+    not_a_dir.write_text("# Post")
+
+    assert MarkdownHandler.find_markdown_files(tmp_path / "missing") == []
+    assert MarkdownHandler.find_markdown_files(not_a_dir) == []
+
+
+def test_iter_markdown_files_skips_non_files(temp_input_dir: Path) -> None:
+    """Test lazy discovery yields only markdown files"""
+    from lib.file_handler import MarkdownHandler
+
+    (temp_input_dir / "drafts.md").mkdir()  # Directory with .md suffix
+    (temp_input_dir / "notes.txt").write_text("Not markdown")
+
+    files = MarkdownHandler.iter_markdown_files(temp_input_dir)
+
+    assert not isinstance(files, list)
+    assert list(files) == [temp_input_dir / "test-post.md"]
+
+
 def test_parse_markdown_with_frontmatter(temp_input_dir: Path) -> None:
     """Test parsing markdown with YAML frontmatter"""
     from lib.file_handler import MarkdownHandler
@@ -59,6 +83,39 @@ This is the body content.
     assert "body content" in body
 
 
+def test_parse_markdown_cache_invalidated_on_change(tmp_path: Path) -> None:
+    """Test repeated parses are cached until the file changes"""
+    import os
+
+    from lib.file_handler import MarkdownHandler
+
+    md_file = tmp_path / "post.md"
+    md_file.write_text("---\ntitle: First\n---\nBody")
+
+    first = MarkdownHandler.parse_markdown_post(md_file)
+    assert MarkdownHandler.parse_markdown_post(md_file) is first
+
+    md_file.write_text("---\ntitle: Second version\n---\nBody")
+    stat = md_file.stat()
+    os.utime(md_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    front_matter, _ = MarkdownHandler.parse_markdown_post(md_file)
+    assert front_matter["title"] == "Second version"
+
+
+def test_parse_markdown_dashes_inside_frontmatter(tmp_path: Path) -> None:
+    """Test '---' inside a front matter value does not end the front matter"""
+    from lib.file_handler import MarkdownHandler
+
+    md_file = tmp_path / "dashes.md"
+    md_file.write_text('---\ntitle: "Before---After"\n---\n\nBody text')
+
+    front_matter, body = MarkdownHandler.parse_markdown_post(md_file)
+
+    assert front_matter["title"] == "Before---After"
+    assert body == "Body text"
+
+
 def test_parse_markdown_without_frontmatter(tmp_path: Path) -> None:
     """Test parsing markdown without frontmatter"""
     from lib.file_handler import MarkdownHandler
@@ -127,6 +184,34 @@ def test_ensure_output_directory_idempotent(tmp_path: Path) -> None:
     assert output_path.parent.exists()
 
 
+def test_ensure_output_directories_dedupes_parents(tmp_path: Path) -> None:
+    """Test that ensure_output_directories creates each parent once"""
+    from unittest.mock import patch
+
+    from lib.file_handler import OutputHandler
+
+    paths = [tmp_path / "a" / f"{i}.png" for i in range(5)] + [tmp_path / "b" / "x.png"]
+
+    with patch("pathlib.Path.mkdir", autospec=True) as mock_mkdir:
+        OutputHandler.ensure_output_directories(paths)
+
+    created = sorted(call.args[0] for call in mock_mkdir.call_args_list)
+    assert created == [tmp_path / "a", tmp_path / "b"]
+
+
+def test_ensure_output_directory_recreates_deleted_dir(tmp_path: Path) -> None:
+    """Test that a directory removed after a first call is created again"""
+    from lib.file_handler import OutputHandler
+
+    output_path = tmp_path / "out" / "banner.png"
+    OutputHandler.ensure_output_directory(output_path)
+    output_path.parent.rmdir()
+
+    OutputHandler.ensure_output_directory(output_path)
+
+    assert output_path.parent.is_dir()
+
+
 def test_generate_batch_output_paths() -> None:
     """Test batch path generation with timestamp"""
     from lib.file_handler import OutputHandler
@@ -161,6 +246,16 @@ def test_generate_batch_output_paths_auto_timestamp() -> None:
     assert paths[1].name.endswith("_02.png")
 
 
+def test_generate_batch_output_paths_unique_per_batch() -> None:
+    """Test that batches started in the same second get distinct names"""
+    from lib.file_handler import OutputHandler
+
+    first = OutputHandler.generate_batch_output_paths(Path("test.md"), Path("/out"), 1)
+    second = OutputHandler.generate_batch_output_paths(Path("test.md"), Path("/out"), 1)
+
+    assert first[0] != second[0]
+
+
 def test_generate_batch_output_paths_large_count() -> None:
     """Test batch path generation with large count"""
     from lib.file_handler import OutputHandler
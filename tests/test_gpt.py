@@ -1,10 +1,32 @@
 """Tests for GPT client module"""
 
-from unittest.mock import Mock, patch
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 
 
+@dataclass
+class _Message:
+    content: str
+
+
+@dataclass
+class _Choice:
+    message: _Message
+
+
+@dataclass
+class _Response:
+    choices: list[_Choice]
+
+
+def _response(*contents: str) -> _Response:
+    """Build a chat completion stub with one choice per content string"""
+    return _Response([_Choice(_Message(content)) for content in contents])
+
+
 def test_gpt_client_initialization(mock_env_vars: None) -> None:
     """Test GPT client initialization"""
     from lib.gpt import GPTClient
@@ -32,9 +54,8 @@ def test_generate_prompts_default(mock_openai: Mock, mock_env_vars: None) -> Non
     from lib.gpt import GPTClient
 
     mock_client = Mock()
-    mock_response = Mock()
     numbered_prompts = "\n".join([f"{i}. Prompt {i}" for i in range(1, 11)])
-    mock_response.choices = [Mock(message=Mock(content=numbered_prompts))]
+    mock_response = _response(numbered_prompts)
     mock_client.chat.completions.create.return_value = mock_response
     mock_openai.return_value = mock_client
 
@@ -45,6 +66,8 @@ def test_generate_prompts_default(mock_openai: Mock, mock_env_vars: None) -> Non
     assert all(isinstance(p, str) for p in prompts)
     assert prompts[0] == "Prompt 1"
     mock_client.chat.completions.create.assert_called_once()
+    call_kwargs = mock_client.chat.completions.create.call_args.kwargs
+    assert call_kwargs["extra_body"] == {"prompt_cache_key": "banner-prompts:origami-3d-generator"}
 
 
 @patch("lib.gpt.OpenAI")
@@ -53,9 +76,8 @@ def test_generate_prompts_custom_count(mock_openai: Mock, mock_env_vars: None) -
     from lib.gpt import GPTClient
 
     mock_client = Mock()
-    mock_response = Mock()
     numbered_prompts = "\n".join([f"{i}. Prompt {i}" for i in range(1, 6)])
-    mock_response.choices = [Mock(message=Mock(content=numbered_prompts))]
+    mock_response = _response(numbered_prompts)
     mock_client.chat.completions.create.return_value = mock_response
     mock_openai.return_value = mock_client
 
@@ -75,7 +97,6 @@ def test_generate_prompts_handles_various_formats(mock_openai: Mock, mock_env_va
     from lib.gpt import GPTClient
 
     mock_client = Mock()
-    mock_response = Mock()
     # Mix of formats: "1.", "2)", "3 -", "4-"
     mixed_format = """1. First prompt
 2) Second prompt
@@ -84,7 +105,7 @@ def test_generate_prompts_handles_various_formats(mock_openai: Mock, mock_env_va
 5. Fifth prompt
 6. Sixth prompt
 7. Seventh prompt"""
-    mock_response.choices = [Mock(message=Mock(content=mixed_format))]
+    mock_response = _response(mixed_format)
     mock_client.chat.completions.create.return_value = mock_response
     mock_openai.return_value = mock_client
 
@@ -99,9 +120,29 @@ def test_generate_prompts_handles_various_formats(mock_openai: Mock, mock_env_va
     assert prompts[2] == "Third prompt"
 
 
+@patch("lib.gpt.OpenAI")
+def test_generate_prompts_strips_quotes_and_extra_lines(
+    mock_openai: Mock, mock_env_vars: None
+) -> None:
+    """Test quoted, two-digit numbered items parse and surplus items are dropped"""
+    from lib.gpt import GPTClient
+
+    mock_client = Mock()
+    numbered_prompts = "\n".join(f'{i}. "Prompt {i}"' for i in range(1, 13))
+    mock_response = _response(numbered_prompts)
+    mock_client.chat.completions.create.return_value = mock_response
+    mock_openai.return_value = mock_client
+
+    client = GPTClient()
+    prompts = client.generate_prompts("Title", "Content", "origami-3d-generator", num_prompts=10)
+
+    assert len(prompts) == 10
+    assert prompts[9] == "Prompt 10"
+
+
 @patch("lib.gpt.OpenAI")
 def test_generate_prompts_handles_exception(mock_openai: Mock, mock_env_vars: None) -> None:
-    """Test prompt generation handles API exceptions"""
+    """Test API errors that outlast the SDK retries are raised to the caller"""
     from lib.gpt import GPTClient
 
     mock_client = Mock()
@@ -110,5 +151,285 @@ def test_generate_prompts_handles_exception(mock_openai: Mock, mock_env_vars: No
 
     client = GPTClient()
 
-    with pytest.raises(SystemExit):
+    with pytest.raises(Exception, match="API Error"):
         client.generate_prompts("Title", "Content", "origami-3d-generator")
+    mock_openai.assert_called_once_with(api_key=client.api_key, max_retries=3)
+
+
+@patch("lib.gpt.OpenAI")
+def test_generate_prompts_keeps_post_text_after_static_prefix(
+    mock_openai: Mock, mock_env_vars: None
+) -> None:
+    """Test requests for the same style share everything before the post text"""
+    from lib.gpt import GPTClient
+
+    mock_client = Mock()
+    mock_client.chat.completions.create.return_value = _response("1. Prompt 1")
+    mock_openai.return_value = mock_client
+
+    client = GPTClient()
+    client.generate_prompts("First post", "Alpha", "origami-3d-generator", 1)
+    client.generate_prompts("Second post", "Beta", "origami-3d-generator", 1)
+
+    first, second = (
+        c.kwargs["messages"] for c in mock_client.chat.completions.create.call_args_list
+    )
+    assert first[0] == second[0]
+    first_user, second_user = first[1]["content"], second[1]["content"]
+    prefix = first_user[: first_user.index("First post")]
+    assert prefix and second_user.startswith(prefix)
+
+
+@patch("lib.gpt.AsyncOpenAI")
+def test_agenerate_prompts_samples_parallel_choices(
+    mock_async_openai: Mock, mock_env_vars: None
+) -> None:
+    """Test async generation splits the prompt count across choices of one request"""
+    import asyncio
+
+    from lib.gpt import GPTClient
+
+    mock_client = Mock()
+    numbered_prompts = "\n".join([f"{i}. Prompt {i}" for i in range(1, 6)])
+    mock_response = _response(numbered_prompts, numbered_prompts)
+    mock_client.chat.completions.create = AsyncMock(return_value=mock_response)
+    mock_async_openai.return_value = mock_client
+
+    client = GPTClient()
+    client.parallel_requests = 2
+    prompts = asyncio.run(
+        client.agenerate_prompts("Title", "Content", "origami-3d-generator", num_prompts=10)
+    )
+
+    assert len(prompts) == 10
+    mock_client.chat.completions.create.assert_called_once()
+    assert mock_client.chat.completions.create.call_args.kwargs["n"] == 2
+
+
+@patch("lib.gpt.AsyncOpenAI")
+def test_agenerate_prompts_batch_returns_results_in_order(
+    mock_async_openai: Mock, mock_env_vars: None
+) -> None:
+    """Test batch generation keeps input order and returns per-post errors"""
+    import asyncio
+
+    from lib.gpt import GPTClient
+
+    def respond(**kwargs: object) -> _Response:
+        user_prompt = kwargs["messages"][1]["content"]  # type: ignore[index]
+        if "Broken" in user_prompt:
+            raise RuntimeError("rate limited")
+        title = "First" if "First" in user_prompt else "Second"
+        return _response(f"1. {title} prompt")
+
+    mock_client = Mock()
+    mock_client.chat.completions.create = AsyncMock(side_effect=respond)
+    mock_async_openai.return_value = mock_client
+
+    client = GPTClient()
+    results = asyncio.run(
+        client.agenerate_prompts_batch(
+            [("First", "a"), ("Broken", "b"), ("Second", "c")],
+            "origami-3d-generator",
+            num_prompts=1,
+        )
+    )
+
+    assert results[0] == ["First prompt"]
+    assert isinstance(results[1], RuntimeError)
+    assert results[2] == ["Second prompt"]
+    mock_async_openai.assert_called_once()
+
+
+@patch("lib.gpt.AsyncOpenAI")
+@patch("lib.gpt.OpenAI")
+def test_gpt_client_async_context_closes_pools(
+    mock_openai: Mock, mock_async_openai: Mock, mock_env_vars: None
+) -> None:
+    """Test the async context closes both clients and the next loop gets a new one"""
+    import asyncio
+
+    from lib.gpt import GPTClient
+
+    mock_async_openai.side_effect = lambda **kwargs: Mock(close=AsyncMock())
+    client = GPTClient()
+
+    async def use_client() -> Mock:
+        async with client:
+            return client.async_client  # type: ignore[return-value]
+
+    first = asyncio.run(use_client())
+    second = asyncio.run(use_client())
+
+    assert first is not second
+    first.close.assert_awaited_once()
+    assert mock_openai.return_value.close.call_count == 2
+
+
+@patch("lib.gpt.time.sleep")
+@patch("lib.gpt.OpenAI")
+def test_generate_prompts_via_batch(
+    mock_openai: Mock, mock_sleep: Mock, mock_env_vars: None
+) -> None:
+    """Test Batch API submission, polling and per-post result mapping"""
+    import json
+
+    from lib.gpt import GPTClient
+
+    output_lines = [
+        {"custom_id": "1", "response": {"body": {"choices": [{"message": {"content": "1. B"}}]}}},
+        {"custom_id": "0", "response": {"body": {"choices": [{"message": {"content": "1. A"}}]}}},
+        {"custom_id": "2", "response": None, "error": {"message": "failed"}},
+    ]
+    mock_client = Mock()
+    mock_client.batches.create.return_value = Mock(id="batch_1", status="in_progress")
+    mock_client.batches.retrieve.return_value = Mock(
+        id="batch_1", status="completed", output_file_id="file_out"
+    )
+    mock_client.files.content.return_value = Mock(
+        text="\n".join(json.dumps(line) for line in output_lines)
+    )
+    mock_openai.return_value = mock_client
+
+    results = GPTClient().generate_prompts_via_batch(
+        [("First", "a"), ("Second", "b"), ("Third", "c")], "origami-3d-generator", num_prompts=1
+    )
+
+    assert results == [["A"], ["B"], []]
+    mock_sleep.assert_called_once()
+    _, upload = mock_client.files.create.call_args.kwargs["file"]
+    first_request = json.loads(upload.decode().splitlines()[0])
+    assert first_request["custom_id"] == "0"
+    assert first_request["body"]["prompt_cache_key"] == "banner-prompts:origami-3d-generator"
+    assert "extra_body" not in first_request["body"]
+
+
+@patch("lib.gpt.OpenAI")
+def test_generate_prompts_json_mode(mock_openai: Mock, mock_env_vars: None) -> None:
+    """Test prompts are requested in JSON mode and read from the prompts array"""
+    import json
+
+    from lib.gpt import GPTClient
+
+    mock_client = Mock()
+    content = json.dumps({"prompts": ["First prompt", " Second prompt ", "", "Third"]})
+    mock_client.chat.completions.create.return_value = _response(content)
+    mock_openai.return_value = mock_client
+
+    prompts = GPTClient().generate_prompts("Title", "Content", "origami-3d-generator", 2)
+
+    assert prompts == ["First prompt", "Second prompt"]
+    call_kwargs = mock_client.chat.completions.create.call_args.kwargs
+    assert call_kwargs["response_format"] == {"type": "json_object"}
+
+
+class _FakeStream:
+    """Async chat completion stream that counts the chunks read"""
+
+    def __init__(self, pieces: list[str]) -> None:
+        self.pieces = pieces
+        self.read = 0
+        self.close = AsyncMock()
+
+    async def __aiter__(self) -> AsyncIterator[Mock]:
+        for piece in self.pieces:
+            self.read += 1
+            yield Mock(choices=[Mock(index=0, delta=Mock(content=piece))])
+
+
+@patch("lib.gpt.AsyncOpenAI")
+def test_astream_prompts_yields_prompts_as_they_complete(
+    mock_async_openai: Mock, mock_env_vars: None
+) -> None:
+    """Test streamed JSON is parsed item by item, across chunk boundaries"""
+    import asyncio
+
+    from lib.gpt import GPTClient
+
+    pieces = ['{"prom', 'pts": ["First', ' prompt", "Sec', 'ond \\"quoted\\""', ', "Third"]}']
+
+    stream = _FakeStream(pieces)
+    mock_client = Mock()
+    mock_client.chat.completions.create = AsyncMock(return_value=stream)
+    mock_async_openai.return_value = mock_client
+
+    client = GPTClient()
+
+    async def collect() -> list[tuple[str, int]]:
+        seen = []
+        async for prompt in client.astream_prompts("Title", "Content", "origami-3d-generator", 2):
+            seen.append((prompt, len(seen)))
+        return seen
+
+    assert asyncio.run(collect()) == [("First prompt", 0), ('Second "quoted"', 1)]
+    assert mock_client.chat.completions.create.call_args.kwargs["stream"] is True
+    # The stream is closed as soon as enough prompts arrived, not read to the end
+    assert stream.read == 4
+    stream.close.assert_awaited_once()
+
+
+@patch("lib.gpt.AsyncOpenAI")
+def test_astream_prompts_closes_stream_when_exhausted(
+    mock_async_openai: Mock, mock_env_vars: None
+) -> None:
+    """Test the stream is closed after the last chunk when fewer prompts arrive"""
+    import asyncio
+
+    from lib.gpt import GPTClient
+
+    stream = _FakeStream(['{"prompts": ["Only"]}'])
+    mock_client = Mock()
+    mock_client.chat.completions.create = AsyncMock(return_value=stream)
+    mock_async_openai.return_value = mock_client
+
+    client = GPTClient()
+
+    async def collect() -> list[str]:
+        return [
+            p async for p in client.astream_prompts("Title", "Content", "origami-3d-generator", 3)
+        ]
+
+    assert asyncio.run(collect()) == ["Only"]
+    stream.close.assert_awaited_once()
+
+
+def test_prompt_stream_parser_numbered_list() -> None:
+    """Test numbered-list output is emitted line by line, with the tail on close"""
+    from lib.gpt import _PromptStreamParser
+
+    parser = _PromptStreamParser(json_mode=False, limit=3)
+
+    assert parser.feed("1. First\n2. Sec") == ["First"]
+    assert parser.feed("ond\n3. Th") == ["Second"]
+    assert parser.close() == ["Th"]
+
+
+def test_fit_content_keeps_opening_and_closing() -> None:
+    """Test long content is trimmed to its head and tail within the token budget"""
+    from lib.gpt import _fit_content
+
+    short = "A short post."
+    assert _fit_content(short, 500, "gpt-4o") is short
+
+    long = "opening " + "filler words " * 5000 + "closing"
+    trimmed = _fit_content(long, 500, "gpt-4o")
+    assert len(trimmed) < len(long)
+    assert trimmed.startswith("opening ")
+    assert trimmed.endswith("closing")
+    assert "\n...\n" in trimmed
+
+
+def test_fit_content_estimates_when_tiktoken_cannot_load() -> None:
+    """Test a tokenizer that fails to download falls back to the length estimate"""
+    from lib.gpt import CHARS_PER_TOKEN, _encoding, _fit_content
+
+    offline = Mock()
+    offline.encoding_for_model.side_effect = OSError("network unreachable")
+    _encoding.cache_clear()
+    try:
+        with patch("lib.gpt.tiktoken", offline):
+            trimmed = _fit_content("x" * 10_000, 500, "gpt-4o")
+    finally:
+        _encoding.cache_clear()
+
+    assert len(trimmed) == 500 * CHARS_PER_TOKEN + len("\n...\n")
@@ -0,0 +1,88 @@
+"""Tests for prompt cache module"""
+
+import time
+from pathlib import Path
+
+import pytest
+
+from lib.prompt_cache import (
+    get_cached_prompts,
+    hash_prompt,
+    load_cache,
+    prune_cache,
+    save_cache,
+    set_cached_prompts,
+)
+
+
+def test_hash_prompt_is_stable_and_distinct() -> None:
+    """Test cache keys are deterministic and depend on every field"""
+    key = hash_prompt("origami-3d-generator", "Title", "Body")
+
+    assert key == hash_prompt("origami-3d-generator", "Title", "Body")
+    assert len(key) == 64
+    assert key != hash_prompt("cyberpunk-generator", "Title", "Body")
+    assert key != hash_prompt("origami-3d-generator", "Other", "Body")
+    assert key != hash_prompt("origami-3d-generator", "Title", "Other")
+
+
+def test_save_and_load_cache_roundtrip(tmp_path: Path) -> None:
+    """Test cache survives a save/load cycle"""
+    cache_path = tmp_path / "cache" / "prompts.json"
+    cache: dict = {}
+    set_cached_prompts(cache, "key", ["Prompt 1", "Prompt 2"])
+
+    save_cache(cache, cache_path)
+    loaded = load_cache(cache_path)
+
+    assert get_cached_prompts(loaded, "key", 2, ttl=60) == ["Prompt 1", "Prompt 2"]
+
+
+def test_save_and_load_cache_without_orjson(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test the stdlib json fallback reads and writes the same format"""
+    monkeypatch.setattr("lib.prompt_cache.orjson", None)
+    cache_path = tmp_path / "prompts.json"
+    cache: dict = {}
+    set_cached_prompts(cache, "key", ["Prompt ✨"], terms={"quality": 2})
+
+    save_cache(cache, cache_path)
+    loaded = load_cache(cache_path)
+
+    assert loaded["key"]["prompts"] == ["Prompt ✨"]
+    assert loaded["key"]["terms"] == {"quality": 2}
+
+
+def test_load_cache_missing_or_corrupt(tmp_path: Path) -> None:
+    """Test missing or corrupt cache files load as empty"""
+    assert load_cache(tmp_path / "missing.json") == {}
+
+    corrupt = tmp_path / "prompts.json"
+    corrupt.write_text("{not json")
+    assert load_cache(corrupt) == {}
+
+
+def test_get_cached_prompts_misses() -> None:
+    """Test expired, short, disabled, and unknown entries miss"""
+    cache: dict = {}
+    set_cached_prompts(cache, "key", ["Prompt 1", "Prompt 2"])
+
+    assert get_cached_prompts(cache, "unknown", 1, ttl=60) is None
+    assert get_cached_prompts(cache, "key", 3, ttl=60) is None
+    assert get_cached_prompts(cache, "key", 1, ttl=0) is None
+    assert get_cached_prompts(cache, "key", 1, ttl=60) == ["Prompt 1"]
+
+    cache["key"]["created_at"] = time.time() - 120
+    assert get_cached_prompts(cache, "key", 1, ttl=60) is None
+
+
+def test_prune_cache_drops_expired_and_oldest_entries() -> None:
+    """Test pruning removes expired entries and caps the entry count"""
+    now = time.time()
+    cache = {f"key{i}": {"prompts": [], "created_at": now - i} for i in range(5)}
+    cache["stale"] = {"prompts": [], "created_at": now - 3600}
+
+    prune_cache(cache, ttl=60, max_entries=3)
+
+    assert sorted(cache) == ["key0", "key1", "key2"]
@@ -3,6 +3,8 @@
 from pathlib import Path
 from unittest.mock import patch
 
+import pytest
+
 
 def test_prompt_loader_loads_yaml(tmp_path: Path) -> None:
     """Test that PromptLoader loads prompts from YAML"""
@@ -28,9 +30,6 @@ origami:
     try:
         os.chdir(tmp_path)
 
-        # Force reload by clearing singleton
-        PromptLoader._instance = None
-
         loader = PromptLoader()
         system, user = loader.get_simple_prompts()
 
@@ -39,16 +38,12 @@ origami:
         assert "{content}" in user
     finally:
         os.chdir(original_dir)
-        PromptLoader._instance = None
 
 
 def test_prompt_loader_get_base_prompts() -> None:
     """Test getting base prompts"""
     from lib.prompts import PromptLoader
 
-    # Force reload
-    PromptLoader._instance = None
-
     loader = PromptLoader()
     system, user = loader.get_base_prompts()
 
@@ -77,15 +72,29 @@ def test_prompt_loader_format_user_prompt() -> None:
     assert "{content}" not in result
 
 
-def test_prompt_loader_singleton() -> None:
-    """Test that PromptLoader is a singleton"""
+def test_prompt_loader_format_user_prompt_matches_str_format() -> None:
+    """Test precompiled formatting agrees with str.format, including escapes"""
     from lib.prompts import PromptLoader
 
-    # Force reload
-    PromptLoader._instance = None
+    loader = PromptLoader()
+    templates = [
+        'Style: {style}\nReturn {{"prompts": [...]}} for {title}: {content} ({count})',
+        "{title!r} has {count:>3} prompts",  # needs full str.format handling
+    ]
+    for template in templates:
+        expected = template.format(title="T", content="C", style="s", count=5)
+        assert loader.format_user_prompt(template, "T", "C", style="s", count=5) == expected
+
+    with pytest.raises(KeyError):
+        loader.format_user_prompt("{title} {missing}", "T", "C")
+
 
-    loader1 = PromptLoader()
-    loader2 = PromptLoader()
+def test_prompt_loader_singleton() -> None:
+    """Test that get_prompt_loader returns the same instance"""
+    from lib.prompts import get_prompt_loader
+
+    loader1 = get_prompt_loader()
+    loader2 = get_prompt_loader()
 
     assert loader1 is loader2
 
@@ -105,9 +114,7 @@ def test_prompt_loader_fallback_when_no_file() -> None:
     """Test that fallback prompts are used when YAML file is missing"""
     from lib.prompts import PromptLoader
 
-    # Force reload and ensure no prompts.yaml exists
-    PromptLoader._instance = None
-
+    # Ensure no prompts.yaml exists
     with patch("pathlib.Path.exists", return_value=False):
         loader = PromptLoader()
         system, user = loader.get_base_prompts()
@@ -143,7 +150,6 @@ simple:
     original_dir = os.getcwd()
     try:
         os.chdir(tmp_path)
-        PromptLoader._instance = None
 
         loader = PromptLoader()
         system, user = loader.get_simple_prompts()
@@ -153,4 +159,40 @@ simple:
         assert user == "Local user"
     finally:
         os.chdir(original_dir)
-        PromptLoader._instance = None
+
+
+def test_prompt_loader_reuses_parsed_yaml(tmp_path: Path) -> None:
+    """Test that an unchanged prompts file is parsed once and non-mappings fall back"""
+    import yaml
+
+    from lib.prompts import PromptLoader
+
+    prompts_file = tmp_path / "prompts.yaml"
+    prompts_file.write_text('simple:\n  system: "Cached system"\n  user: "Cached user"\n')
+
+    with patch("lib.prompts.yaml.load", wraps=yaml.load) as mock_load:
+        first = PromptLoader()._load_yaml(prompts_file)
+        second = PromptLoader()._load_yaml(prompts_file)
+
+    assert first is second
+    assert mock_load.call_count == 1
+
+    prompts_file.write_text("- just\n- a list\n")
+    assert "simple" in PromptLoader()._load_yaml(prompts_file)  # fallback prompts
+
+
+def test_prompt_loader_base_prompts_for_style() -> None:
+    """Test per-style base prompts carry the style description and are memoized"""
+    from lib.deepai.styles import get_style_loader
+    from lib.prompts import PromptLoader
+
+    loader = PromptLoader()
+    prompts = loader.get_base_prompts_for_style("origami-3d-generator")
+    style = get_style_loader().get_style("origami-3d-generator")
+
+    assert prompts[:2] == loader.get_base_prompts()
+    assert style is not None and prompts[2] == style.description
+    assert loader.get_base_prompts_for_style("origami-3d-generator") is prompts
+
+    fallback = loader.get_base_prompts_for_style("unknown-style")
+    assert fallback[2] == "General-purpose image generation"
@@ -10,6 +10,7 @@ def test_parse_selection_single() -> None:
     assert parse_selection("1", 10) == [0]
     assert parse_selection("5", 10) == [4]
     assert parse_selection("10", 10) == [9]
+    assert parse_selection(" 7 ", 10) == [6]
 
 
 def test_parse_selection_multiple() -> None:
@@ -84,3 +85,30 @@ def test_parse_selection_empty_parts() -> None:
     """Test handling of empty parts"""
     assert parse_selection("1,,3", 10) == [0, 2]
     assert parse_selection("1,  ,3", 10) == [0, 2]
+
+
+def test_parse_selection_tabs_and_mixed_separators() -> None:
+    """Test that any whitespace separates selections"""
+    assert parse_selection("1\t3\n5", 10) == [0, 2, 4]
+    assert parse_selection("1\t-\t3, 7", 10) == [0, 1, 2, 6]
+
+
+def test_parse_selection_set_fallback(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that large item counts use the set path with the same results"""
+    import lib.selection_parser
+
+    monkeypatch.setattr(lib.selection_parser, "MAX_BYTEARRAY_COUNT", 5)
+    assert parse_selection("9,1-3,2", 10) == [0, 1, 2, 8]
+
+
+def test_parse_selection_rejects_partial_numeric_tokens() -> None:
+    """Test a token is read whole, never as a number plus leftovers"""
+    assert parse_selection("5a-", 10) == []  # Half-open range, ignored
+    assert parse_selection("4 - ", 10) == []
+    assert parse_selection("4 - ,7", 10) == [6]
+
+    with pytest.raises(ValueError, match="Invalid range format: 3x-4"):
+        parse_selection("3x-4", 10)
+
+    with pytest.raises(ValueError, match="Invalid number: 5a"):
+        parse_selection("1,5a", 10)
@@ -0,0 +1,62 @@
+"""Tests for semantic cache module"""
+
+import time
+
+from lib.prompt_cache import set_cached_prompts
+from lib.semantic_cache import cosine_similarity, find_similar_prompts, term_vector
+
+BODY = (
+    "Quality is not an act, it is a habit. Teams that invest in reviews, "
+    "testing and clear ownership ship better software over time."
+)
+
+
+def test_term_vector_counts_words() -> None:
+    """Test term vectors are lowercase word counts"""
+    vector = term_vector("Hello World", "hello again")
+
+    assert vector == {"hello": 2, "world": 1, "again": 1}
+
+
+def test_cosine_similarity_bounds() -> None:
+    """Test similarity of identical, disjoint and empty vectors"""
+    vector = term_vector("Title", BODY)
+
+    assert abs(cosine_similarity(vector, vector) - 1.0) < 1e-9
+    assert cosine_similarity(vector, {"unrelated": 3}) == 0.0
+    assert cosine_similarity(vector, {}) == 0.0
+
+
+def test_find_similar_prompts_matches_minor_edit() -> None:
+    """Test a lightly edited draft reuses cached prompts of the same style"""
+    cache: dict = {}
+    set_cached_prompts(
+        cache,
+        "key",
+        ["Prompt 1", "Prompt 2"],
+        style="origami-3d-generator",
+        terms=term_vector("The Meaning of Quality", BODY),
+    )
+    edited = term_vector("The Meaning of Quality", BODY + " Really.")
+
+    assert find_similar_prompts(cache, "origami-3d-generator", edited, 2, 60, 0.92) == [
+        "Prompt 1",
+        "Prompt 2",
+    ]
+    # Different style, too many prompts, or dissimilar post: miss
+    assert find_similar_prompts(cache, "cyberpunk-generator", edited, 2, 60, 0.92) is None
+    assert find_similar_prompts(cache, "origami-3d-generator", edited, 3, 60, 0.92) is None
+    other = term_vector("Cooking pasta", "Boil water and add salt.")
+    assert find_similar_prompts(cache, "origami-3d-generator", other, 1, 60, 0.92) is None
+
+
+def test_find_similar_prompts_respects_ttl() -> None:
+    """Test expired entries and disabled cache never match"""
+    cache: dict = {}
+    vector = term_vector("Title", BODY)
+    set_cached_prompts(cache, "key", ["Prompt"], style="s", terms=vector)
+
+    assert find_similar_prompts(cache, "s", vector, 1, 0, 0.92) is None
+
+    cache["key"]["created_at"] = time.time() - 120
+    assert find_similar_prompts(cache, "s", vector, 1, 60, 0.92) is None